@@ -0,0 +1,56 @@
+"""
+Analytics library entry point - one import for the Vector / analyzer toolkit
+Fast to import: every name is loaded from its module on first use
+
+Importing this module has no side effects (no prints, no heavy imports).
+`from analytics import PortfolioAnalyzer` only loads vector_basics and
+week1_miniproject; asyncio, process pools, mmap etc. are only imported
+when the feature that needs them is used.
+
+Example:
+    >>> import analytics
+    >>> analytics.Vector([1, 2, 3]).norm()
+    3.7416573867739413
+"""
+import importlib
+
+# Public name → module that defines it
+_EXPORTS = {
+    'Vector': 'vector_basics',
+    'LazyVector': 'lazy_vector',
+    'PortfolioAnalyzer': 'week1_miniproject',
+    'correlation_distance': 'clustering',
+    'linkage_tree': 'clustering',
+    'quasi_diagonal_order': 'clustering',
+    'cut_tree': 'clustering',
+    'Profiler': 'profiling',
+    'MarketDataService': 'market_service',
+    'IncrementalStats': 'market_service',
+    'CorrelationCache': 'corr_cache',
+    'SharedReturns': 'shared_returns',
+    'SharedReturnsPublisher': 'shared_returns',
+    'screen_pairs': 'pairs_screening',
+    'walk_forward_backtest': 'pairs_backtest',
+    'CorrelationGraph': 'sparse_correlation',
+    'CorrelationStability': 'correlation_stability',
+    'shrunk_covariance': 'shrinkage',
+    'factor_decomposition': 'pca',
+    'universe_statistics': 'risk_statistics',
+    'RegimeIndex': 'regime_search',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """Load a public name from its module on first access (PEP 562)"""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,364 @@
+"""
+Differential test harness - every Vector backend against one reference
+Run with: python backend_harness.py [--cases 300] [--seed 0]
+
+Backends: plain lists (blocked summation), array('d'), array('f') storage,
+read-only memoryviews (as handed out by shared_returns) and lazy fused
+expressions. Each one runs the same operations on the same random and
+edge-case inputs (constant series, length mismatches, huge and tiny
+magnitudes, ...) as a reference implementation on plain lists that uses
+exact sums (math.fsum) and overflow-safe scaling.
+
+Backends are compared on the values they actually store (array('f')
+rounds its inputs to float32), so the tolerance stays tight for all of
+them. Results must agree within tolerance. The reference never raises on
+overflow: its exact sums saturate to ±inf the way float arithmetic does.
+So an exception only matches when both sides reject invalid input with a
+ValueError (e.g. a length mismatch). Per-backend timings are recorded
+next to the checks, and the reference is timed once per case, so
+speedups are measured on the cases that were verified.
+"""
+import argparse
+import math
+import random
+import time
+from array import array
+
+from vector_basics import Vector
+from week1_miniproject import PortfolioAnalyzer
+
+# name → (build a backend vector from a list, storage typecode)
+BACKENDS = {
+    'list': (lambda data: Vector(list(data)), 'd'),
+    'array_d': (lambda data: Vector(array('d', data)), 'd'),
+    'array_f': (lambda data: Vector(array('f', data)), 'f'),
+    'memoryview': (lambda data: Vector(memoryview(array('d', data)).toreadonly()), 'd'),
+    'lazy': (lambda data: Vector(list(data)).lazy(), 'd'),
+}
+
+RELATIVE_TOLERANCE = 1e-9
+
+
+def _values(result):
+    """Plain list of numbers from a Vector / LazyVector result"""
+    if hasattr(result, 'to_vector'):
+        result = result.to_vector()
+    return list(result.components)
+
+
+# --- Reference implementation (plain lists, exact sums) ---
+
+def _check_lengths(a, b):
+    if len(a) != len(b):
+        raise ValueError("length mismatch")
+
+
+def _scaled_l2(values):
+    """sqrt(sum x²) without overflow / underflow"""
+    scale = max(map(abs, values), default=0.0)
+    if scale == 0 or not math.isfinite(scale):
+        return scale
+    return scale * math.sqrt(math.fsum((x / scale) ** 2 for x in values))
+
+
+def _exact_sum(values):
+    """Correctly rounded sum: ±inf past the largest float, nan for inf - inf"""
+    values = list(values)
+    if not all(map(math.isfinite, values)):
+        return sum(values)  # inf / nan inputs: float semantics
+    try:
+        return math.fsum(values)
+    except OverflowError:
+        # Exact total is beyond the float range; its sign survives scaling
+        return math.copysign(math.inf, math.fsum(x * 2.0 ** -64 for x in values))
+
+
+def ref_mean(a):
+    return _exact_sum(a) / len(a)
+
+
+def ref_deviations(a):
+    mean = ref_mean(a)
+    return [x - mean for x in a]
+
+
+def ref_std(a):
+    return _scaled_l2(ref_deviations(a)) / math.sqrt(len(a))
+
+
+def ref_norm(a, p):
+    if p == 2:
+        return _scaled_l2(a)
+    if p == math.inf:
+        return max(map(abs, a))
+    try:
+        return _exact_sum(abs(x) ** p for x in a) ** (1 / p)
+    except OverflowError:
+        # |x|^p overflows: scale by the largest entry first
+        scale = max(map(abs, a))
+        return scale * _exact_sum((abs(x) / scale) ** p for x in a) ** (1 / p)
+
+
+def ref_dot(a, b):
+    _check_lengths(a, b)
+    products = [x * y for x, y in zip(a, b)]
+    if all(map(math.isfinite, products)):
+        return _exact_sum(products)
+    # Single products overflow: sum them scaled down (exact total, then ±inf)
+    return _exact_sum((x * 2.0 ** -600) * y for x, y in zip(a, b)) * 2.0 ** 600
+
+
+def ref_distance(a, b):
+    _check_lengths(a, b)
+    return _scaled_l2([x - y for x, y in zip(a, b)])
+
+
+def ref_correlation(a, b):
+    _check_lengths(a, b)
+    if max(a) == min(a) or max(b) == min(b):
+        return 0.0  # Zero variance
+    da, db = ref_deviations(a), ref_deviations(b)
+    norm_a, norm_b = _scaled_l2(da), _scaled_l2(db)
+    return _exact_sum((x / norm_a) * (y / norm_b) for x, y in zip(da, db))
+
+
+def ref_add(a, b):
+    _check_lengths(a, b)
+    return [x + y for x, y in zip(a, b)]
+
+
+# name → (reference(a, b), backend(v, w), degree of the result in the input scale)
+OPERATIONS = {
+    'mean': (lambda a, b: ref_mean(a), lambda v, w: v.mean(), 1),
+    'std': (lambda a, b: ref_std(a), lambda v, w: v.std(), 1),
+    'norm_1': (lambda a, b: ref_norm(a, 1), lambda v, w: v.norm(1), 1),
+    'norm_2': (lambda a, b: ref_norm(a, 2), lambda v, w: v.norm(), 1),
+    'norm_3': (lambda a, b: ref_norm(a, 3), lambda v, w: v.norm(3), 1),
+    'norm_inf': (lambda a, b: ref_norm(a, math.inf), lambda v, w: v.norm(math.inf), 1),
+    'dot': (ref_dot, lambda v, w: v.dot(w), 2),
+    'distance': (ref_distance, lambda v, w: v.distance(w), 1),
+    'correlation': (ref_correlation, lambda v, w: v.correlation_with(w), 0),
+    'add': (ref_add, lambda v, w: _values(v.add(w)), 1),
+    'scale': (lambda a, b: [2.5 * x for x in a], lambda v, w: _values(v.scalar_multiply(2.5)), 1),
+    'de_mean': (lambda a, b: ref_deviations(a), lambda v, w: _values(v.de_mean()), 1),
+}
+
+
+def agree(expected, actual, absolute=0.0, relative=RELATIVE_TOLERANCE):
+    """
+    Compare a reference result with a backend result.
+
+    Exceptions only agree if both sides raised ValueError (invalid input);
+    any other exception (OverflowError, ZeroDivisionError, ...) is a
+    mismatch. A non-finite expected number (overflow) only requires a
+    non-finite actual number; lists must agree element by element.
+    """
+    if isinstance(expected, Exception) or isinstance(actual, Exception):
+        return type(expected) is ValueError and type(actual) is ValueError
+    if isinstance(expected, list):
+        return (isinstance(actual, list) and len(expected) == len(actual)
+                and all(agree(e, a, absolute, relative) for e, a in zip(expected, actual)))
+    if not math.isfinite(expected):
+        return not math.isfinite(actual)
+    return abs(actual - expected) <= absolute + relative * abs(expected)
+
+
+def _call(function, *args):
+    try:
+        return function(*args)
+    except (ValueError, ZeroDivisionError, OverflowError) as exc:
+        return exc
+
+
+# --- Inputs ---
+
+def edge_cases():
+    """(name, a, b) inputs that have broken numeric code before"""
+    rng = random.Random(12345)
+    base = [rng.gauss(0, 0.02) for _ in range(50)]
+    other = [rng.gauss(0, 0.02) for _ in range(50)]
+    long_a = [rng.gauss(0, 1) for _ in range(2000)]
+    long_b = [0.6 * x + rng.gauss(0, 1) for x in long_a]
+    return [
+        ('constant', [0.1] * 40, other[:40]),
+        ('constant_both', [0.7] * 300, [-0.037] * 300),
+        ('zeros', [0.0] * 10, base[:10]),
+        ('single', [0.03], [-0.01]),
+        ('identical', base, list(base)),
+        ('negated', base, [-x for x in base]),
+        ('huge', [x * 1e210 for x in base], [x * 1e210 for x in other]),
+        # Products overflow (x·y ~ 1e306 summed over 2000 terms) while the
+        # inputs, norms of the unit vectors and results stay finite
+        ('large_1e152', [x * 1e152 for x in long_a], [x * 1e152 for x in long_b]),
+        ('large_1e153', [x * 1e153 for x in long_a], [x * 1e153 for x in long_b]),
+        ('large_1e154', [x * 1e154 for x in long_a], [x * 1e154 for x in long_b]),
+        ('large_1e100', [x * 1e100 for x in base], [x * 1e100 for x in other]),
+        # Finite elements whose sum overflows
+        ('overflowing_sum', [abs(x) * 1e306 for x in long_a], [abs(x) * 1e306 for x in long_b]),
+        ('tiny', [x * 1e-190 for x in base], [x * 1e-190 for x in other]),
+        ('mixed_scale', [x * 10 ** rng.randint(-8, 8) for x in base], other),
+        ('integers', [rng.randint(-5, 5) for _ in range(30)], [rng.randint(-5, 5) for _ in range(30)]),
+        ('length_mismatch_longer', base[:20], other[:21]),
+        ('length_mismatch_shorter', base[:21], other[:20]),
+        ('long_blocked', [rng.gauss(0, 0.01) for _ in range(1000)],
+         [rng.gauss(0, 0.01) for _ in range(1000)]),
+    ]
+
+
+def random_cases(n_cases, seed=0):
+    """Random return-like pairs with varied lengths, scales and tails"""
+    rng = random.Random(seed)
+    cases = []
+    for k in range(n_cases):
+        n = rng.choice([rng.randint(1, 20), rng.randint(2, 300), rng.randint(250, 2000)])
+        scale = 10 ** rng.uniform(-4, 2)
+        tail = rng.choice([1, 1, 5])  # Occasional fat-tailed jumps
+        a = [rng.gauss(0, scale) * (tail if rng.random() < 0.02 else 1) for _ in range(n)]
+        beta = rng.uniform(-1.5, 1.5)
+        b = [beta * x + rng.gauss(0, scale) for x in a]
+        cases.append((f"random_{k}", a, b))
+    return cases
+
+
+def _stored(data, typecode):
+    """Values as the backend stores them (float32 rounding for 'f')"""
+    return list(array(typecode, data))
+
+
+# --- Harness ---
+
+def check_vectors(cases, backends=None):
+    """
+    Run every operation on every backend and compare with the reference.
+
+    Returns:
+        Tuple (mismatches, timings, counts): mismatches are (case, backend,
+        operation, expected, actual) tuples; timings are
+        {backend: {operation: seconds}} with 'reference' included
+    """
+    backends = backends or list(BACKENDS)
+    timings = {name: {op: 0.0 for op in OPERATIONS} for name in ['reference'] + backends}
+    mismatches = []
+    counts = {'checked': 0, 'skipped': 0}
+
+    for case_name, a, b in cases:
+        # Reference results per storage typecode, computed (and timed) once
+        references = {}
+        for backend in backends:
+            build, typecode = BACKENDS[backend]
+            stored_a, stored_b = _stored(a, typecode), _stored(b, typecode)
+            if not all(map(math.isfinite, stored_a + stored_b)):
+                counts['skipped'] += 1  # Not representable (e.g. 1e210 in float32)
+                continue
+            if typecode not in references:
+                # Only the first typecode of a case counts towards the reference
+                # timings, so they are comparable with one backend's timings
+                timed = not references
+                references[typecode] = {}
+                for op, (reference, _, _) in OPERATIONS.items():
+                    start = time.perf_counter()
+                    references[typecode][op] = _call(reference, stored_a, stored_b)
+                    if timed:
+                        timings['reference'][op] += time.perf_counter() - start
+            expected_results = references[typecode]
+
+            v, w = build(a), build(b)
+            scale = max(map(abs, stored_a + stored_b), default=0.0)
+            for op, (_, operation, degree) in OPERATIONS.items():
+                start = time.perf_counter()
+                actual = _call(operation, v, w)
+                timings[backend][op] += time.perf_counter() - start
+                # Absolute slack for results that cancel to ~0 (e.g. std of a constant)
+                try:
+                    absolute = 1e-12 * scale ** degree
+                except OverflowError:
+                    absolute = math.inf  # Exact result overflows too (compared as non-finite)
+                expected = expected_results[op]
+                counts['checked'] += 1
+                if not agree(expected, actual, absolute):
+                    mismatches.append((case_name, backend, op, expected, actual))
+    return mismatches, timings, counts
+
+
+def check_portfolios(n_portfolios=5, n_assets=5, n_obs=120, seed=0, backends=None):
+    """
+    Correlation matrices and statistics of random portfolios built from
+    each backend, against the reference (one zero-variance asset included).
+
+    Returns:
+        List of (portfolio, backend, quantity, expected, actual) mismatches
+    """
+    backends = backends or list(BACKENDS)
+    rng = random.Random(seed)
+    mismatches = []
+    for k in range(n_portfolios):
+        market = [rng.gauss(0, 0.01) for _ in range(n_obs)]
+        data = {f"A{i}": [rng.uniform(0, 1.5) * m + rng.gauss(0, 0.01) for m in market]
+                for i in range(n_assets - 1)}
+        data['CASH'] = [0.0001] * n_obs  # Zero variance: correlation 0.0
+        for backend in backends:
+            build, typecode = BACKENDS[backend]
+            stored = {asset: _stored(values, typecode) for asset, values in data.items()}
+            analyzer = PortfolioAnalyzer({asset: build(values) for asset, values in data.items()})
+            matrix = analyzer.correlation_matrix()['matrix']
+            stats = analyzer.portfolio_statistics()
+            for i, asset_i in enumerate(analyzer.assets):
+                for j, asset_j in enumerate(analyzer.assets):
+                    expected = 1.0 if i == j else ref_correlation(stored[asset_i], stored[asset_j])
+                    if not agree(expected, matrix[i][j], 1e-12):
+                        mismatches.append((k, backend, f"corr {asset_i}/{asset_j}",
+                                           expected, matrix[i][j]))
+                for key, reference in (('mean_return', ref_mean), ('volatility', ref_std)):
+                    expected = reference(stored[asset_i])
+                    if not agree(expected, stats[asset_i][key], 1e-15):
+                        mismatches.append((k, backend, f"{key} {asset_i}",
+                                           expected, stats[asset_i][key]))
+    return mismatches
+
+
+def run(n_cases=300, seed=0, backends=None):
+    """
+    Full differential run: edge cases, random cases and random portfolios.
+
+    Returns:
+        Dictionary with 'mismatches', 'timings', 'checked' and 'skipped'
+    """
+    cases = edge_cases() + random_cases(n_cases, seed)
+    mismatches, timings, counts = check_vectors(cases, backends)
+    mismatches += check_portfolios(seed=seed, backends=backends)
+    return {'mismatches': mismatches, 'timings': timings, **counts}
+
+
+def print_report(report):
+    """Timing table (seconds per operation) with speedups vs the reference"""
+    timings = report['timings']
+    names = list(timings)
+    print(f"{'Operation':<12}" + "".join(f"{name:>12}" for name in names))
+    print("-" * (12 + 12 * len(names)))
+    for op in OPERATIONS:
+        print(f"{op:<12}" + "".join(f"{timings[name][op]:>12.4f}" for name in names))
+    totals = {name: sum(timings[name].values()) for name in names}
+    print("-" * (12 + 12 * len(names)))
+    print(f"{'total':<12}" + "".join(f"{totals[name]:>12.4f}" for name in names))
+    print(f"{'speedup':<12}" + "".join(f"{totals['reference'] / totals[name]:>11.2f}x"
+                                       for name in names))
+
+    print(f"\n{report['checked']} checks, {report['skipped']} backend/case pairs skipped "
+          f"(not representable), {len(report['mismatches'])} mismatches")
+    for mismatch in report['mismatches'][:20]:
+        print("  MISMATCH case=%s backend=%s op=%s expected=%r actual=%r" % mismatch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differential test of Vector backends")
+    parser.add_argument('--cases', type=int, default=300, help="Random cases")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), help="Backends to test")
+    args = parser.parse_args(argv)
+    report = run(args.cases, args.seed, args.backends)
+    print_report(report)
+    return 1 if report['mismatches'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
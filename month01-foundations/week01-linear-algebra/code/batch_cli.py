@@ -0,0 +1,289 @@
+"""
+Batch portfolio analyzer - run PortfolioAnalyzer over many portfolios
+Nightly job entry point: parallel, machine-readable output, progress on stderr
+
+Usage:
+    python batch_cli.py --portfolios clients.json --returns returns.csv \\
+        --output results/ --workers 8
+
+Inputs:
+    Portfolio file (JSON): a list of {"name": "client-1", "assets": ["SPY", "QQQ"]}
+    Returns file: CSV with one column per asset (header row = asset names,
+                  optional first column named "date"), or JSON {asset: [returns]}
+
+Outputs (in --output):
+    <name>.json      statistics, top pairs, diversification pairs, matrix
+    <name>.corr.bin  float64 matrix, row-major (with --format binary)
+    summary.json     per-portfolio timings and errors
+
+Portfolio names become file names with every character outside
+[A-Za-z0-9._-] replaced by '_' (no leading dots), so a name can never
+write outside --output. Names that collide after this, or with
+summary.json, are rejected before anything runs. Entries without a name are reported as "#<index>".
+"""
+import json
+import os
+import re
+import sys
+import time
+from array import array
+
+from vector_basics import Vector
+from week1_miniproject import PortfolioAnalyzer
+
+
+def load_returns(path):
+    """
+    Load a returns file.
+
+    Returns:
+        Dictionary of {asset_name: list of returns}
+    """
+    if path.endswith('.json'):
+        with open(path) as f:
+            return {asset: [float(x) for x in values] for asset, values in json.load(f).items()}
+
+    import csv
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        columns = [[] for _ in header]
+        for row in reader:
+            for k, value in enumerate(row):
+                columns[k].append(value)
+    return {asset: [float(x) for x in column]
+            for asset, column in zip(header, columns) if asset.lower() != 'date'}
+
+
+def load_portfolios(paths):
+    """Read portfolio definitions from one or more JSON files"""
+    portfolios = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        portfolios.extend(data if isinstance(data, list) else [data])
+    return portfolios
+
+
+def output_stem(name):
+    """File name stem for a portfolio name (no path separators, no leading dots)"""
+    stem = re.sub(r'[^A-Za-z0-9._-]', '_', str(name)).lstrip('.')
+    return stem or '_'
+
+
+def portfolio_label(index, portfolio):
+    """Name used in the summary: the portfolio's name, or '#<index>' if it has none"""
+    if isinstance(portfolio, dict) and isinstance(portfolio.get('name'), str):
+        return portfolio['name']
+    return f"#{index}"
+
+
+# Output stems written by the batch itself (summary.json)
+RESERVED_STEMS = {'summary'}
+
+
+def check_unique_names(portfolios):
+    """
+    Raise ValueError if two portfolios would write the same output files,
+    or one would overwrite a file of the batch (e.g. a portfolio 'summary')
+    """
+    seen = {}
+    duplicates = []
+    reserved = []
+    for index, portfolio in enumerate(portfolios):
+        label = portfolio_label(index, portfolio)
+        stem = output_stem(label)
+        if stem in RESERVED_STEMS:
+            reserved.append(repr(label))
+        elif stem in seen:
+            duplicates.append(f"{seen[stem]!r} / {label!r}")
+        else:
+            seen[stem] = label
+    if reserved:
+        raise ValueError(f"Reserved portfolio names: {', '.join(reserved)}")
+    if duplicates:
+        raise ValueError(f"Duplicate portfolio names: {', '.join(duplicates)}")
+
+
+def analyze_portfolio(returns, portfolio, options):
+    """
+    Run the analyzer on one portfolio.
+
+    Args:
+        returns: Dictionary of {asset_name: list of returns} (shared universe)
+        portfolio: {"name": ..., "assets": [...]}
+        options: Dictionary of thresholds ('pairs_threshold', 'div_threshold', 'top')
+
+    Returns:
+        Result dictionary (JSON serializable)
+    """
+    assets = portfolio['assets']
+    missing = [a for a in assets if a not in returns]
+    if missing:
+        raise KeyError(f"no returns for {', '.join(missing)}")
+
+    analyzer = PortfolioAnalyzer({asset: Vector(returns[asset]) for asset in assets})
+    corr_data = analyzer.correlation_matrix()  # O(n²·T): computed once, shared below
+    pairs = analyzer.find_pairs_trading_candidates(threshold=options['pairs_threshold'],
+                                                   corr_data=corr_data)
+    div_pairs = analyzer.find_best_diversification_pairs(threshold=options['div_threshold'],
+                                                         corr_data=corr_data)
+    top = options['top']
+
+    return {
+        'name': portfolio['name'],
+        'assets': corr_data['assets'],
+        'statistics': analyzer.portfolio_statistics(),
+        'pairs_trading': [list(p) for p in pairs[:top]],
+        'diversification': [list(p) for p in div_pairs[:top]],
+        'matrix': corr_data['matrix'],
+    }
+
+
+def write_result(result, output_dir, fmt):
+    """Write one portfolio result (JSON, plus a binary matrix in binary mode)"""
+    name = output_stem(result['name'])
+    if fmt == 'binary':
+        with open(os.path.join(output_dir, f"{name}.corr.bin"), 'wb') as f:
+            for row in result['matrix']:
+                array('d', row).tofile(f)
+        result = dict(result, matrix=f"{name}.corr.bin")
+    with open(os.path.join(output_dir, f"{name}.json"), 'w') as f:
+        json.dump(result, f, separators=(',', ':'))
+
+
+# Shared universe for pool workers (loaded once per worker by the initializer)
+_worker_returns = None
+
+
+def _init_worker(returns):
+    global _worker_returns
+    _worker_returns = returns
+
+
+def _run_one(index, portfolio, options, output_dir, fmt):
+    start = time.perf_counter()
+    try:
+        write_result(analyze_portfolio(_worker_returns, portfolio, options), output_dir, fmt)
+        error = None
+    except Exception as exc:
+        # One bad portfolio (malformed entry, failed write, ...) must not
+        # stop the rest of the batch
+        error = f"{type(exc).__name__}: {exc}"
+    return portfolio_label(index, portfolio), time.perf_counter() - start, error
+
+
+def run_batch(returns, portfolios, output_dir, options, workers=1, fmt='json', progress=None):
+    """
+    Analyze every portfolio and write the results.
+
+    Args:
+        returns: Dictionary of {asset_name: list of returns}
+        portfolios: List of {"name": ..., "assets": [...]}
+        output_dir: Directory for the result files (created if missing)
+        options: Thresholds passed to analyze_portfolio()
+        workers: Number of worker processes (1 = run in this process)
+        fmt: 'json' or 'binary' (matrix written as float64 file)
+        progress: Optional callback(done, total, name, seconds, error)
+
+    Returns:
+        Summary dictionary with timings and errors
+
+    Raises:
+        ValueError: If two portfolios have the same (sanitized) name
+    """
+    check_unique_names(portfolios)
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    total = len(portfolios)
+    timings = {}
+    errors = {}
+
+    def record(done, outcome):
+        name, seconds, error = outcome
+        timings[name] = seconds
+        if error:
+            errors[name] = error
+        if progress:
+            progress(done, total, name, seconds, error)
+
+    if workers <= 1:
+        _init_worker(returns)
+        try:
+            for done, (index, portfolio) in enumerate(enumerate(portfolios), 1):
+                record(done, _run_one(index, portfolio, options, output_dir, fmt))
+        finally:
+            _init_worker(None)
+    else:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(returns,)) as pool:
+            futures = {pool.submit(_run_one, index, p, options, output_dir, fmt): index
+                       for index, p in enumerate(portfolios)}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    outcome = future.result()
+                except Exception as exc:  # Worker died, result not picklable, ...
+                    index = futures[future]
+                    outcome = (portfolio_label(index, portfolios[index]), 0.0,
+                               f"{type(exc).__name__}: {exc}")
+                record(done, outcome)
+
+    summary = {
+        'portfolios': total,
+        'failed': len(errors),
+        'workers': workers,
+        'wall_seconds': time.perf_counter() - start,
+        'timings': timings,
+        'errors': errors,
+    }
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+    return summary
+
+
+def print_progress(done, total, name, seconds, error):
+    """Default progress reporter (stderr)"""
+    status = f"FAILED {error}" if error else "ok"
+    print(f"[{done}/{total}] {name} {seconds * 1000:.1f} ms {status}", file=sys.stderr)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    import argparse  # Only needed when run as a command (keeps import fast)
+
+    parser = argparse.ArgumentParser(description="Run PortfolioAnalyzer over many portfolios")
+    parser.add_argument('--portfolios', nargs='+', required=True, help="Portfolio JSON files")
+    parser.add_argument('--returns', nargs='+', required=True, help="Returns CSV/JSON files")
+    parser.add_argument('--output', required=True, help="Output directory")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--format', choices=('json', 'binary'), default='json')
+    parser.add_argument('--pairs-threshold', type=float, default=0.85)
+    parser.add_argument('--div-threshold', type=float, default=0.5)
+    parser.add_argument('--top', type=int, default=10, help="Pairs kept per list")
+    parser.add_argument('--quiet', action='store_true', help="No per-portfolio progress")
+    args = parser.parse_args(argv)
+
+    load_start = time.perf_counter()
+    returns = {}
+    for path in args.returns:
+        returns.update(load_returns(path))
+    portfolios = load_portfolios(args.portfolios)
+    print(f"Loaded {len(returns)} assets and {len(portfolios)} portfolios in "
+          f"{time.perf_counter() - load_start:.2f} s", file=sys.stderr)
+
+    options = {'pairs_threshold': args.pairs_threshold,
+               'div_threshold': args.div_threshold, 'top': args.top}
+    try:
+        summary = run_batch(returns, portfolios, args.output, options, workers=args.workers,
+                            fmt=args.format, progress=None if args.quiet else print_progress)
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 2
+    print(f"Done: {summary['portfolios']} portfolios, {summary['failed']} failed, "
+          f"{summary['wall_seconds']:.2f} s", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Import-time benchmark - keeps cold-start latency of the library in check
+Run with: python bench_import.py [--repeat 5]
+
+Each module is imported in a fresh interpreter (cold start). The script
+reports the median import time above a bare `python -c pass`, checks that
+importing prints nothing and pulls in no heavy modules, and exits with
+status 1 if a module is over its budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Module → cold import budget in milliseconds (on top of interpreter start)
+BUDGETS_MS = {
+    'vector_basics': 20,
+    'week1_miniproject': 25,
+    'analytics': 25,
+    'day3_trading_example': 25,
+    'day4_trading_example': 25,
+    'batch_cli': 40,
+}
+
+# Modules that must only load when the feature using them is called
+HEAVY_MODULES = (
+    'asyncio', 'concurrent.futures', 'multiprocessing', 'mmap', 'hashlib',
+    'numpy', 'threading',
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+CHECK_SCRIPT = (
+    "import sys, {module}; "
+    "print(','.join(m for m in {heavy!r} if m in sys.modules))"
+)
+
+
+def cold_start_ms(code, repeat):
+    """Median wall time (ms) of running `python -c code` in a fresh process"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=HERE, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def check_import(module):
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        Tuple (printed_output, heavy_modules_loaded)
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK_SCRIPT.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=HERE, check=True, capture_output=True, text=True)
+    lines = result.stdout.splitlines()
+    heavy = [m for m in lines[-1].split(',') if m] if lines else []
+    return "\n".join(lines[:-1]), heavy
+
+
+def run(repeat=5):
+    """Benchmark every module; returns True if all are within budget"""
+    baseline = cold_start_ms('pass', repeat)
+    print(f"Interpreter start: {baseline:.1f} ms (subtracted below)")
+    print(f"{'Module':<24} {'Import ms':>10} {'Budget':>8}  Status")
+    print("-" * 60)
+
+    ok = True
+    for module, budget in BUDGETS_MS.items():
+        import_ms = max(0.0, cold_start_ms(f'import {module}', repeat) - baseline)
+        output, heavy = check_import(module)
+        problems = []
+        if import_ms > budget:
+            problems.append("over budget")
+        if output:
+            problems.append("prints at import")
+        if heavy:
+            problems.append("loads " + ", ".join(heavy))
+        ok = ok and not problems
+        print(f"{module:<24} {import_ms:>10.1f} {budget:>8}  {'; '.join(problems) or 'ok'}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per module (median)")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.repeat) else 1)
@@ -0,0 +1,83 @@
+"""
+Summation benchmark - accuracy and speed against math.fsum references
+Run with: python bench_summation.py [--size 10000000]
+
+For each summation strategy, prints the error against the exactly rounded
+math.fsum result (in units of the reference magnitude) and the time per call.
+"""
+import argparse
+import math
+import random
+import time
+
+from summation import blocked_sum, neumaier_sum, pairwise_sum, compensated_dot
+from vector_basics import Vector
+
+
+def naive_loop_sum(values):
+    """Running sum, like the original Vector.mean / dot loops"""
+    total = 0.0
+    for x in values:
+        total += x
+    return total
+
+
+STRATEGIES = [
+    ('naive loop', naive_loop_sum),
+    ('builtin sum', sum),
+    ('pairwise_sum', pairwise_sum),
+    ('neumaier_sum', neumaier_sum),
+    ('blocked_sum', blocked_sum),
+    ('math.fsum', math.fsum),
+]
+
+
+def make_returns(size, seed=0):
+    """Tick-like returns: tiny values with occasional jumps and a drift"""
+    rng = random.Random(seed)
+    return [rng.gauss(1e-6, 1e-4) * (10 if rng.random() < 0.01 else 1) for _ in range(size)]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(size):
+    """Print accuracy/speed tables for sums, dot products and Vector methods"""
+    values = make_returns(size)
+    other = make_returns(size, seed=1)
+    reference = math.fsum(values)
+    scale = math.fsum(map(abs, values))
+
+    print(f"Sum of {size:,} returns (error relative to sum of |x|)")
+    print(f"{'Strategy':<14} {'Rel. error':>12} {'Seconds':>9}")
+    print("-" * 38)
+    for name, function in STRATEGIES:
+        result, seconds = timed(function, values)
+        print(f"{name:<14} {abs(result - reference) / scale:>12.2e} {seconds:>9.3f}")
+
+    products = [a * b for a, b in zip(values, other)]
+    dot_reference = math.fsum(products)
+    dot_scale = math.fsum(map(abs, products))
+    print(f"\nDot product of two {size:,}-element series")
+    for name, function in [('naive loop', lambda a, b: naive_loop_sum(x * y for x, y in zip(a, b))),
+                           ('compensated', compensated_dot)]:
+        result, seconds = timed(function, values, other)
+        print(f"{name:<14} {abs(result - dot_reference) / dot_scale:>12.2e} {seconds:>9.3f}")
+
+    v = Vector(values)
+    mean, seconds = timed(v.mean)
+    print(f"\nVector.mean    {abs(mean - reference / size) / (scale / size):>12.2e} {seconds:>9.3f}")
+    std, seconds = timed(v.std)
+    deviations = [x - reference / size for x in values]
+    std_reference = math.sqrt(math.fsum(d * d for d in deviations) / size)
+    print(f"Vector.std     {abs(std - std_reference) / std_reference:>12.2e} {seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summation accuracy/speed benchmark")
+    parser.add_argument('--size', type=int, default=1_000_000, help="Series length")
+    args = parser.parse_args()
+    run(args.size)
@@ -0,0 +1,278 @@
+"""
+Hierarchical clustering of assets - correlation distance trees
+Builds single / average / Ward linkage trees for portfolio construction (HRP)
+
+Single linkage is built from a minimum spanning tree (Prim, O(n²)) and
+average / Ward linkage use the nearest-neighbour chain algorithm (O(n²)),
+so thousands of assets never hit the naive O(n³) merge loop.
+"""
+import math
+
+LINKAGE_METHODS = ('single', 'average', 'ward')
+
+
+def correlation_distance(matrix):
+    """
+    Convert a correlation matrix into a distance matrix.
+
+    Formula: d(i,j) = sqrt(0.5 * (1 - corr(i,j)))
+    - corr = +1 → distance 0 (identical assets)
+    - corr = -1 → distance 1 (perfect hedge)
+
+    Args:
+        matrix: List of lists (correlation matrix)
+
+    Returns:
+        List of lists (distance matrix, zero diagonal)
+    """
+    n = len(matrix)
+    distances = []
+    for i in range(n):
+        row = []
+        for j in range(n):
+            if i == j:
+                row.append(0.0)
+            else:
+                # Clamp tiny negative values caused by rounding (corr ≈ 1)
+                row.append(math.sqrt(max(0.0, 0.5 * (1.0 - matrix[i][j]))))
+        distances.append(row)
+    return distances
+
+
+def _relabel(n, merges):
+    """
+    Turn (leaf_a, leaf_b, distance) merges into a sorted dendrogram.
+
+    Each merge is given by two leaves that belong to the clusters being
+    joined. Merges are sorted by distance and relabeled with union-find so
+    the output uses cluster ids like scipy: leaves are 0..n-1 and the k-th
+    merge creates cluster n + k.
+
+    Returns:
+        List of (cluster_a, cluster_b, distance, size) tuples
+    """
+    parent = list(range(n))
+    cluster_id = list(range(n))
+    size = [1] * n
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    linkage = []
+    for k, (a, b, dist) in enumerate(sorted(merges, key=lambda m: m[2])):
+        root_a, root_b = find(a), find(b)
+        id_a, id_b = cluster_id[root_a], cluster_id[root_b]
+        if id_a > id_b:
+            id_a, id_b = id_b, id_a
+        merged_size = size[root_a] + size[root_b]
+        parent[root_b] = root_a
+        size[root_a] = merged_size
+        cluster_id[root_a] = n + k
+        linkage.append((id_a, id_b, dist, merged_size))
+    return linkage
+
+
+def _single_linkage(distances):
+    """Single linkage = minimum spanning tree (Prim's algorithm, O(n²))"""
+    n = len(distances)
+    in_tree = [False] * n
+    best = [math.inf] * n
+    best_from = [0] * n
+    best[0] = 0.0
+    edges = []
+
+    for _ in range(n):
+        # Pick the closest vertex not yet in the tree
+        current = -1
+        current_dist = math.inf
+        for v in range(n):
+            if not in_tree[v] and best[v] < current_dist:
+                current, current_dist = v, best[v]
+        in_tree[current] = True
+        if current != 0:
+            edges.append((best_from[current], current, current_dist))
+
+        row = distances[current]
+        for v in range(n):
+            if not in_tree[v] and row[v] < best[v]:
+                best[v] = row[v]
+                best_from[v] = current
+
+    return edges
+
+
+def _nn_chain_linkage(distances, method):
+    """
+    Average / Ward linkage with the nearest-neighbour chain algorithm.
+
+    Each cluster lives in the slot of one of its leaves. Distances to a
+    merged cluster are updated in place with the Lance-Williams formula.
+    """
+    n = len(distances)
+    dist = [list(row) for row in distances]  # Updated in place
+    size = [1] * n
+    active = set(range(n))
+    chain = []
+    merges = []
+
+    while len(active) > 1:
+        if not chain:
+            chain.append(next(iter(active)))
+
+        a = chain[-1]
+        row_a = dist[a]
+        # Prefer the previous chain element on ties so the chain terminates
+        if len(chain) >= 2:
+            b = chain[-2]
+            best = row_a[b]
+        else:
+            b = -1
+            best = math.inf
+        for c in active:
+            if c != a and row_a[c] < best:
+                b, best = c, row_a[c]
+
+        if len(chain) >= 2 and b == chain[-2]:
+            # Reciprocal nearest neighbours: merge b into a's slot
+            chain.pop()
+            chain.pop()
+            merges.append((a, b, best))
+            active.discard(b)
+            size_a, size_b = size[a], size[b]
+
+            for k in active:
+                if k == a:
+                    continue
+                d_ak, d_bk = dist[a][k], dist[b][k]
+                if method == 'average':
+                    new_dist = (size_a * d_ak + size_b * d_bk) / (size_a + size_b)
+                else:  # ward
+                    size_k = size[k]
+                    total = size_a + size_b + size_k
+                    new_dist = math.sqrt(max(0.0, (
+                        (size_a + size_k) * d_ak * d_ak
+                        + (size_b + size_k) * d_bk * d_bk
+                        - size_k * best * best
+                    ) / total))
+                dist[a][k] = new_dist
+                dist[k][a] = new_dist
+
+            size[a] = size_a + size_b
+        else:
+            chain.append(b)
+
+    return merges
+
+
+def linkage_tree(distances, method='single'):
+    """
+    Build a hierarchical clustering tree from a distance matrix.
+
+    Args:
+        distances: List of lists (symmetric distance matrix)
+        method: 'single', 'average' or 'ward'
+
+    Returns:
+        List of (cluster_a, cluster_b, distance, size) tuples, one per merge,
+        sorted by distance. Leaves are 0..n-1, merge k creates cluster n + k.
+
+    Example:
+        >>> linkage_tree([[0, 1, 4], [1, 0, 3], [4, 3, 0]])
+        [(0, 1, 1, 2), (2, 3, 3, 3)]
+    """
+    if method not in LINKAGE_METHODS:
+        raise ValueError(f"Unknown linkage method {method!r}, expected one of {LINKAGE_METHODS}")
+
+    n = len(distances)
+    if n < 2:
+        return []
+    if method == 'single':
+        merges = _single_linkage(distances)
+    else:
+        merges = _nn_chain_linkage(distances, method)
+    return _relabel(n, merges)
+
+
+def quasi_diagonal_order(linkage, n):
+    """
+    Leaf order of the dendrogram (left to right).
+
+    Reordering the correlation matrix by this order puts similar assets next
+    to each other, so the matrix becomes quasi-diagonal (used by HRP).
+
+    Args:
+        linkage: Output of linkage_tree()
+        n: Number of leaves
+
+    Returns:
+        List of leaf indices
+    """
+    if n == 0:
+        return []
+    if not linkage:
+        return list(range(n))
+
+    children = {n + k: (a, b) for k, (a, b, _, _) in enumerate(linkage)}
+    order = []
+    # Iterative depth-first walk (recursion would overflow for large trees)
+    stack = [n + len(linkage) - 1]
+    while stack:
+        node = stack.pop()
+        if node < n:
+            order.append(node)
+        else:
+            left, right = children[node]
+            stack.append(right)
+            stack.append(left)
+    return order
+
+
+def cut_tree(linkage, n, n_clusters=None, max_distance=None):
+    """
+    Assign leaves to flat clusters.
+
+    Args:
+        linkage: Output of linkage_tree()
+        n: Number of leaves
+        n_clusters: Stop merging once this many clusters remain
+        max_distance: Only apply merges with distance <= max_distance
+
+    Returns:
+        List of cluster labels (one per leaf), numbered 0, 1, 2, ... in
+        quasi-diagonal order
+    """
+    if n_clusters is None and max_distance is None:
+        raise ValueError("Give either n_clusters or max_distance")
+
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    n_merges = len(linkage)
+    if n_clusters is not None:
+        n_merges = min(n_merges, max(0, n - n_clusters))
+
+    # Map each cluster id to one of its leaves so merges can be replayed
+    representative = list(range(n))
+    for a, b, dist, _ in linkage[:n_merges]:
+        if max_distance is not None and dist > max_distance:
+            break
+        leaf_a, leaf_b = representative[a], representative[b]
+        parent[find(leaf_b)] = find(leaf_a)
+        representative.append(leaf_a)
+
+    labels = [0] * n
+    label_of_root = {}
+    for leaf in quasi_diagonal_order(linkage, n):
+        root = find(leaf)
+        if root not in label_of_root:
+            label_of_root[root] = len(label_of_root)
+        labels[leaf] = label_of_root[root]
+    return labels
@@ -0,0 +1,240 @@
+"""
+Persisted correlation-matrix cache - content addressed, reused across runs
+Nightly jobs only recompute the rows of assets whose returns changed
+
+Each asset is keyed by a hash of its return buffer. A cached matrix is
+stored with the hashes of its assets, so any pair whose two hashes are
+already in a cached matrix is copied instead of recomputed.
+
+File format (native byte order, loaded with mmap):
+    8 bytes   magic b'CORRMAT1'
+    8 bytes   n (unsigned 64-bit)
+    n * 16    asset digests (16 raw bytes each)
+    n * n * 8 float64 matrix, row-major
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+
+MAGIC = b'CORRMAT1'
+DIGEST_SIZE = 16
+HEADER = struct.Struct('=8sQ')
+
+
+def asset_digest(vector):
+    """
+    Content hash of a return series.
+
+    Args:
+        vector: Vector of returns
+
+    Returns:
+        16-byte digest (bytes)
+    """
+    buffer = array('d', vector.components).tobytes()
+    return hashlib.blake2b(buffer, digest_size=DIGEST_SIZE).digest()
+
+
+def params_key(**params):
+    """Short hash of the computation parameters (part of every cache key)"""
+    text = json.dumps(params, sort_keys=True)
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+def write_matrix(path, digests, matrix):
+    """Write a matrix file atomically (temp file + rename)"""
+    n = len(digests)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, n))
+        f.write(b''.join(digests))
+        for row in matrix:
+            array('d', row).tofile(f)
+    os.replace(tmp_path, path)
+
+
+class MatrixFile:
+    """
+    Read-only, memory-mapped view of a cached matrix.
+
+    Only the pages that are actually read get loaded from disk.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, n = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a correlation matrix file")
+        self.n = n
+        start = HEADER.size
+        self.digests = [bytes(self._mmap[start + k * DIGEST_SIZE:start + (k + 1) * DIGEST_SIZE])
+                        for k in range(n)]
+        data_start = start + n * DIGEST_SIZE
+        self.values = memoryview(self._mmap)[data_start:data_start + n * n * 8].cast('d')
+
+    def get(self, i, j):
+        """Matrix entry (i, j)"""
+        return self.values[i * self.n + j]
+
+    def close(self):
+        if getattr(self, 'values', None) is not None:
+            self.values.release()
+            self.values = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class CorrelationCache:
+    """
+    On-disk cache of correlation matrices with size-bounded LRU eviction.
+
+    Example:
+        >>> cache = CorrelationCache('/var/cache/corr', max_bytes=512 * 2**20)
+        >>> corr_data = analyzer.correlation_matrix(cache=cache)
+        >>> corr_data['cache']
+        {'reused_pairs': 4851, 'computed_pairs': 99}
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, directory, max_bytes=256 * 2**20):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total size limit of the cached matrices
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.index = self._load_index()
+
+    def _index_path(self):
+        return os.path.join(self.directory, self.INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path()) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose file disappeared
+        return {name: entry for name, entry in index.items()
+                if os.path.exists(os.path.join(self.directory, name))}
+
+    def _save_index(self):
+        tmp_path = self._index_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self._index_path())
+
+    def _best_entry(self, key, digests):
+        """Cached matrix (same parameters) sharing the most assets"""
+        wanted = {d.hex() for d in digests}
+        best_name, best_overlap = None, 0
+        for name, entry in self.index.items():
+            if entry['params'] != key:
+                continue
+            overlap = len(wanted.intersection(entry['digests']))
+            if overlap > best_overlap or (
+                    overlap == best_overlap and best_name is not None
+                    and entry['last_used'] > self.index[best_name]['last_used']):
+                best_name, best_overlap = name, overlap
+        return best_name
+
+    def _evict(self, keep):
+        """Remove least recently used matrices until under max_bytes"""
+        total = sum(entry['size'] for entry in self.index.values())
+        for name in sorted(self.index, key=lambda k: self.index[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self.index[name]['size']
+            del self.index[name]
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def correlation_matrix(self, analyzer):
+        """
+        Correlation matrix of an analyzer, reusing cached pairs.
+
+        Args:
+            analyzer: PortfolioAnalyzer
+
+        Returns:
+            Dictionary like PortfolioAnalyzer.correlation_matrix() plus a
+            'cache' entry with the number of reused / computed pairs
+        """
+        assets = analyzer.assets
+        n = len(assets)
+        vectors = [analyzer.returns[asset] for asset in assets]
+        digests = [asset_digest(v) for v in vectors]
+        key = params_key(method='pearson', diagonal=1.0)
+
+        matrix = [[None] * n for _ in range(n)]
+        for i in range(n):
+            matrix[i][i] = 1.0  # Asset always perfectly correlated with itself
+        reused = 0
+
+        base_name = self._best_entry(key, digests)
+        if base_name is not None:
+            with MatrixFile(os.path.join(self.directory, base_name)) as cached:
+                position = {d: k for k, d in enumerate(cached.digests)}
+                cached_pos = [position.get(d) for d in digests]
+                for i in range(n):
+                    pi = cached_pos[i]
+                    if pi is None:
+                        continue
+                    row = matrix[i]
+                    for j in range(i + 1, n):
+                        pj = cached_pos[j]
+                        if pj is not None and pi != pj:
+                            row[j] = matrix[j][i] = cached.get(pi, pj)
+                            reused += 1
+            self.index[base_name]['last_used'] = time.time()
+
+        # Recompute only the missing entries (rows of changed assets)
+        # (same correlation_with() as the uncached path, so results match exactly)
+        computed = 0
+        for i in range(n):
+            row = matrix[i]
+            for j in range(i + 1, n):
+                if row[j] is not None:
+                    continue
+                row[j] = matrix[j][i] = vectors[i].correlation_with(vectors[j])
+                computed += 1
+
+        if computed or base_name is None:
+            name = f"{key}-{hashlib.blake2b(b''.join(digests), digest_size=8).hexdigest()}.bin"
+            path = os.path.join(self.directory, name)
+            write_matrix(path, digests, matrix)
+            self.index[name] = {
+                'params': key,
+                'digests': [d.hex() for d in digests],
+                'size': os.path.getsize(path),
+                'last_used': time.time(),
+            }
+            base_name = name
+        self._evict(keep=base_name)
+        self._save_index()
+
+        return {
+            'matrix': matrix,
+            'assets': assets,
+            'cache': {'reused_pairs': reused, 'computed_pairs': computed}
+        }
@@ -0,0 +1,280 @@
+"""
+Correlation stability - is a pair's correlation the same in every period?
+A full-sample correlation of 0.9 can hide 0.99 last year and 0.6 this year
+
+The history is cut into consecutive blocks and one correlation matrix is
+computed per block (unit vectors per block, so every pair is a dot
+product). Each pair then gets:
+- dispersion: standard deviation of its block correlations
+- Fisher-z homogeneity test: Q = sum (n_b - 3) (z_b - z_mean)², with
+  z = atanh(correlation), chi-square with (blocks - 1) degrees of freedom
+- break test: z-test of the latest block against all earlier blocks
+
+Statistics are kept as flat arrays over the upper triangle (one entry per
+pair) and accumulated block by block with running updates, so memory
+stays at a few arrays of n_pairs floats and the flags for every pair
+come from one comparison against a critical value computed once.
+
+Example:
+    >>> stability = analyzer.correlation_stability(n_blocks=4)
+    >>> stability.stats('SPY', 'QQQ')['p_value']
+    >>> stable = stability.filter_pairs(analyzer.find_pairs_trading_candidates())
+"""
+import math
+import operator
+from array import array
+
+from sparse_correlation import unit_vector
+from vector_basics import Vector
+
+# Largest |correlation| fed to atanh (keeps z finite for identical series)
+_MAX_CORRELATION = 1 - 1e-12
+
+
+def chi2_sf(x, df):
+    """
+    Chi-square survival function P(X > x) (regularized upper gamma).
+
+    Series expansion below a + 1, continued fraction above (Numerical
+    Recipes gammq).
+    """
+    if x <= 0:
+        return 1.0
+    a = df / 2
+    x = x / 2
+    log_prefactor = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        for n in range(1, 1000):
+            term *= x / (a + n)
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1 - total * math.exp(log_prefactor))
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = d if abs(d) > tiny else tiny
+        c = b + an / c
+        c = c if abs(c) > tiny else tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefactor) * h
+
+
+def chi2_critical(significance, df):
+    """Critical value c with P(X > c) = significance (bisection on chi2_sf)"""
+    lo, hi = 0.0, max(1.0, df)
+    while chi2_sf(hi, df) > significance:
+        hi *= 2
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if chi2_sf(mid, df) > significance:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def normal_critical(significance):
+    """Two-sided critical value of the standard normal (1.96 at 5%)"""
+    lo, hi = 0.0, 40.0
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if math.erfc(mid / math.sqrt(2)) > significance:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def block_bounds(n_obs, n_blocks):
+    """Consecutive (start, end) blocks of (almost) equal size covering n_obs"""
+    if n_blocks < 2:
+        raise ValueError("Need at least 2 blocks")
+    if n_obs // n_blocks < 4:
+        raise ValueError(f"{n_obs} observations are too few for {n_blocks} blocks "
+                         f"(Fisher z needs at least 4 per block)")
+    edges = [round(k * n_obs / n_blocks) for k in range(n_blocks + 1)]
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def block_correlations(returns_list, bounds):
+    """
+    Upper-triangle correlations of every block.
+
+    Args:
+        returns_list: List of Vectors (same length)
+        bounds: List of (start, end) blocks
+
+    Returns:
+        List with one array('d') per block; pair (i, j), i < j, is at
+        position pair_position(n, i, j)
+    """
+    mul = operator.mul
+    blocks = []
+    for start, end in bounds:
+        units = [unit_vector(Vector(r.components[start:end])) for r in returns_list]
+        flat = array('d')
+        for i, ui in enumerate(units):
+            flat.extend([sum(map(mul, ui, uj)) for uj in units[i + 1:]])
+        blocks.append(flat)
+    return blocks
+
+
+def pair_position(n, i, j):
+    """Position of pair (i, j), i < j, in the flattened upper triangle"""
+    return i * (2 * n - i - 1) // 2 + (j - i - 1)
+
+
+class CorrelationStability:
+    """
+    Block correlations and stability statistics for every pair of a universe.
+
+    Pair statistics live in flat arrays over the upper triangle; use
+    stats() for one pair, unstable_pairs() / filter_pairs() for screening.
+    """
+
+    def __init__(self, assets, bounds, blocks, significance=0.05):
+        """
+        Args:
+            assets: Asset names
+            bounds: (start, end) of each block
+            blocks: Block correlations from block_correlations()
+            significance: Test level for the 'stable' / 'break' flags
+        """
+        self.assets = list(assets)
+        self.index = {asset: k for k, asset in enumerate(self.assets)}
+        self.bounds = bounds
+        self.blocks = blocks
+        self.significance = significance
+        n_blocks = len(blocks)
+        clip = _MAX_CORRELATION
+        atanh = math.atanh
+        weights = [end - start - 3 for start, end in bounds]
+
+        # One pass over the blocks with running (Welford) updates, so only
+        # one block of z values exists at a time and every per-pair
+        # statistic stays a flat array('d')
+        zeros = bytes(8 * len(blocks[0]))
+        mean_r, squares = array('d', zeros), array('d', zeros)    # Raw correlations
+        z_mean, q_stat = array('d', zeros), array('d', zeros)     # Weighted Fisher z
+        z_before = z_last = None
+        weight_total = 0
+        for count, (block, weight) in enumerate(zip(blocks, weights), 1):
+            delta = array('d', map(operator.sub, block, mean_r))
+            mean_r = array('d', (m + d / count for m, d in zip(mean_r, delta)))
+            squares = array('d', (s + d * (r - m)
+                                  for s, d, r, m in zip(squares, delta, block, mean_r)))
+
+            z = array('d', (atanh(-clip if r < -clip else clip if r > clip else r)
+                            for r in block))
+            if count == n_blocks:
+                z_before, z_last = z_mean, z   # Pooled earlier blocks vs the latest
+            weight_total += weight
+            share = weight / weight_total
+            delta = array('d', map(operator.sub, z, z_mean))
+            z_mean = array('d', (m + d * share for m, d in zip(z_mean, delta)))
+            q_stat = array('d', (q + weight * d * (zi - m)
+                                 for q, d, zi, m in zip(q_stat, delta, z, z_mean)))
+
+        # Dispersion of the raw block correlations
+        self.dispersion = array('d', (math.sqrt(s / n_blocks) for s in squares))
+        # Fisher-z homogeneity: Q = sum w (z - weighted mean z)²
+        self.mean_correlation = array('d', map(math.tanh, z_mean))
+        self.q_stat = q_stat
+
+        # Latest block against the pooled earlier blocks
+        scale = 1 / math.sqrt(1 / weights[-1] + 1 / sum(weights[:-1]))
+        self.break_z = array('d', ((z - zb) * scale for z, zb in zip(z_last, z_before)))
+
+        q_critical = chi2_critical(significance, n_blocks - 1)
+        z_critical = normal_critical(significance)
+        self.stable = [q <= q_critical for q in self.q_stat]
+        self.broken = [abs(z) > z_critical for z in self.break_z]
+
+    @classmethod
+    def from_returns(cls, returns_dict, n_blocks=4, significance=0.05):
+        """
+        Args:
+            returns_dict: Dictionary of {asset_name: Vector of returns}
+            n_blocks: Number of consecutive blocks
+            significance: Test level for the flags
+
+        Returns:
+            CorrelationStability
+        """
+        assets = list(returns_dict.keys())
+        returns_list = [returns_dict[a] for a in assets]
+        bounds = block_bounds(len(returns_list[0]), n_blocks)
+        return cls(assets, bounds, block_correlations(returns_list, bounds), significance)
+
+    def _position(self, asset1, asset2):
+        i, j = sorted((self.index[asset1], self.index[asset2]))
+        if i == j:
+            raise ValueError("Need two different assets")
+        return pair_position(len(self.assets), i, j)
+
+    def stats(self, asset1, asset2):
+        """
+        Stability statistics of one pair.
+
+        Returns:
+            Dictionary with block_correlations, mean_correlation, dispersion,
+            q_stat, p_value (homogeneity test), break_z, stable and broken
+        """
+        k = self._position(asset1, asset2)
+        return {
+            'block_correlations': [block[k] for block in self.blocks],
+            'mean_correlation': self.mean_correlation[k],
+            'dispersion': self.dispersion[k],
+            'q_stat': self.q_stat[k],
+            'p_value': chi2_sf(self.q_stat[k], len(self.blocks) - 1),
+            'break_z': self.break_z[k],
+            'stable': self.stable[k],
+            'broken': self.broken[k],
+        }
+
+    def unstable_pairs(self):
+        """All pairs that fail the homogeneity test or broke in the last block"""
+        n = len(self.assets)
+        pairs = []
+        k = 0
+        for i in range(n):
+            for j in range(i + 1, n):
+                if not self.stable[k] or self.broken[k]:
+                    pairs.append((self.assets[i], self.assets[j]))
+                k += 1
+        return pairs
+
+    def filter_pairs(self, pairs, max_dispersion=None):
+        """
+        Keep the pairs whose correlation is stable.
+
+        Args:
+            pairs: List of (asset1, asset2, ...) tuples, e.g. from
+                   PortfolioAnalyzer.find_pairs_trading_candidates()
+            max_dispersion: Also reject pairs whose block correlations
+                            spread more than this
+
+        Returns:
+            The stable pairs, in their original order
+        """
+        kept = []
+        for pair in pairs:
+            k = self._position(pair[0], pair[1])
+            if not self.stable[k] or self.broken[k]:
+                continue
+            if max_dispersion is not None and self.dispersion[k] > max_dispersion:
+                continue
+            kept.append(pair)
+        return kept
@@ -0,0 +1,187 @@
+"""
+Lazy Vector expressions - fuse chained operations into a single pass
+Opt in with Vector.lazy(): element-wise operations build an expression tree
+instead of allocating intermediate Vectors
+
+Reductions (mean, dot, norm, std, ...) force the tree: the whole element-wise
+chain plus the reduction run as one pass, with no intermediates. Sums go
+through the same blocked compensated summation as Vector (summation.py).
+
+Evaluation composes builtin map() iterators (operator.add, operator.mul,
+...): elements stream through the whole chain one at a time, so nothing
+is allocated per step and the loops run in C.
+
+Example:
+    >>> v = Vector([2, 4, 6, 8])
+    >>> z = v.lazy().standardize()   # Nothing computed yet (besides mean/std)
+    >>> z.to_vector()                # One pass builds the result
+    Vector([-1.3416..., -0.4472..., 0.4472..., 1.3416...])
+"""
+import math
+import operator
+import sys
+from functools import partial
+from itertools import repeat
+
+from summation import blocked_sum, compensated_co_moments, compensated_dot
+from vector_basics import Vector, _check_same_length
+
+
+class _Node:
+    """Expression tree node: op is 'leaf', 'add', 'sub', 'scale' or 'shift'"""
+    __slots__ = ('op', 'children', 'value', 'length', 'mean')
+
+    def __init__(self, op, children=(), value=None, length=0):
+        self.op = op
+        self.children = children
+        self.value = value      # Components (leaf) or scalar constant
+        self.length = length
+        self.mean = None        # Memoized by LazyVector.mean()
+
+
+def _stream(node):
+    """Iterator over the elements of an expression (fused map() pipeline)"""
+    if node.op == 'leaf':
+        return iter(node.value)
+    if node.op == 'add':
+        left, right = node.children
+        return map(operator.add, _stream(left), _stream(right))
+    if node.op == 'sub':
+        left, right = node.children
+        return map(operator.sub, _stream(left), _stream(right))
+    if node.op == 'scale':
+        return map(partial(operator.mul, node.value), _stream(node.children[0]))
+    return map(operator.sub, _stream(node.children[0]), repeat(node.value))  # shift
+
+
+class LazyVector:
+    """
+    Deferred Vector expression with the same API as Vector.
+
+    Element-wise methods return new LazyVectors (no computation); reductions
+    return numbers computed in one fused pass.
+    """
+
+    def __init__(self, source):
+        """
+        Args:
+            source: Vector, list of numbers or expression node
+        """
+        if isinstance(source, _Node):
+            self.node = source
+        else:
+            components = source.components if isinstance(source, Vector) else source
+            self.node = _Node('leaf', value=components, length=len(components))
+
+    def __repr__(self):
+        return f"LazyVector({self.node.op}, len={len(self)})"
+
+    def __len__(self):
+        return self.node.length
+
+    # --- Element-wise operations (deferred) ---
+
+    def add(self, other):
+        """Vector addition (deferred)"""
+        other = _as_lazy(other)
+        _check_same_length(self, other)
+        return LazyVector(_Node('add', (self.node, other.node),
+                                length=min(len(self), len(other))))
+
+    def __add__(self, other):
+        return self.add(other)
+
+    def __sub__(self, other):
+        """Vector subtraction (deferred)"""
+        other = _as_lazy(other)
+        _check_same_length(self, other)
+        return LazyVector(_Node('sub', (self.node, other.node),
+                                length=min(len(self), len(other))))
+
+    def scalar_multiply(self, scalar):
+        """Scalar multiplication (deferred)"""
+        return LazyVector(_Node('scale', (self.node,), value=scalar, length=len(self)))
+
+    def de_mean(self):
+        """Subtract the mean (forces one pass for the mean, result deferred)"""
+        return LazyVector(_Node('shift', (self.node,), value=self.mean(), length=len(self)))
+
+    def standardize(self):
+        """Z-scores (forces mean and std, result deferred)"""
+        return self.de_mean().scalar_multiply(1 / self.std())
+
+    # --- Reductions (forced, one fused pass each) ---
+
+    def mean(self):
+        """Average of elements"""
+        if self.node.mean is None:
+            self.node.mean = blocked_sum(_stream(self.node)) / len(self)
+        return self.node.mean
+
+    def dot(self, other):
+        """Dot product"""
+        other = _as_lazy(other)
+        _check_same_length(self, other)
+        return compensated_dot(_stream(self.node), _stream(other.node))
+
+    def norm(self, p=2):
+        """p-norm (see Vector.norm)"""
+        if p == float('inf'):
+            return max(map(abs, _stream(self.node)))
+        if p == 1:
+            return blocked_sum(map(abs, _stream(self.node)))
+        if p == 2:
+            sum_squares = blocked_sum(x * x for x in _stream(self.node))
+            if sys.float_info.min <= sum_squares < math.inf:
+                return math.sqrt(sum_squares)
+            # Overflow / underflow of the squares: hypot scales internally
+            return math.hypot(*_stream(self.node))
+        try:
+            return blocked_sum(map(pow, map(abs, _stream(self.node)), repeat(p))) ** (1 / p)
+        except OverflowError:
+            return self.to_vector().norm(p)  # Scaled fallback (see Vector.norm)
+
+    def rms(self):
+        """Root-mean-square value"""
+        return self.norm() / math.sqrt(len(self))
+
+    def std(self):
+        """Standard deviation (population), i.e. RMS of de-meaned vector"""
+        return self.de_mean().rms()
+
+    def distance(self, other):
+        """Euclidean distance, without building the difference vector"""
+        return (self - _as_lazy(other)).norm()
+
+    def correlation_with(self, other):
+        """Correlation coefficient (0.0 if either side has zero variance)"""
+        other = _as_lazy(other)
+        _check_same_length(self, other)
+        a_demean = self.de_mean()
+        b_demean = other.de_mean()
+        numerator, a_ss, b_ss = compensated_co_moments(_stream(a_demean.node),
+                                                       _stream(b_demean.node))
+        n = len(self)
+        rounding = (n * sys.float_info.epsilon) ** 2 * n  # Sum of squared mean errors
+        if (not (sys.float_info.min <= min(a_ss, b_ss) and max(a_ss, b_ss) < math.inf)
+                or a_ss <= rounding * self.mean() ** 2 or b_ss <= rounding * other.mean() ** 2):
+            # (Possibly) zero variance, or squares that overflow / underflow:
+            # the Vector path checks those exactly
+            return self.to_vector().correlation_with(other.to_vector())
+        return numerator / (math.sqrt(a_ss) * math.sqrt(b_ss))
+
+    # --- Materialization ---
+
+    def to_vector(self):
+        """Evaluate the expression into a Vector (one pass)"""
+        if self.node.op == 'leaf':
+            return Vector(list(self.node.value))
+        return Vector(list(_stream(self.node)))
+
+    @property
+    def components(self):
+        return self.to_vector().components
+
+
+def _as_lazy(value):
+    return value if isinstance(value, LazyVector) else LazyVector(value)
@@ -0,0 +1,338 @@
+"""
+Live market-data service - keeps PortfolioAnalyzer statistics up to date
+Consumes return updates from a local feed with asyncio
+
+Each update is one bar: {asset_name: return}. Per-asset moments and the
+pairwise co-moments are updated incrementally (Welford), bursts of updates
+are coalesced into one batch, and all O(n²) work runs in a worker thread so
+the event loop never blocks on it.
+
+Example:
+    >>> service = MarketDataService(['SPY', 'QQQ', 'GLD'])
+    >>> asyncio.run(service.run(replay_feed(bars)))
+    >>> asyncio.run(service.snapshot())['top_pairs']
+"""
+import asyncio
+import json
+import math
+import threading
+from array import array
+
+from risk_statistics import tail_risk
+
+
+class IncrementalStats:
+    """
+    Running mean / variance / co-moments for a fixed list of assets.
+
+    Uses Welford's update (extended to the third and fourth moments) so the
+    statistics stay accurate on long streams and match PortfolioAnalyzer
+    (population std, same correlation). Drawdowns are tracked with a
+    running peak.
+
+    Historical VaR/CVaR need the distribution itself, so they are computed
+    over a rolling window: the last var_window returns of each asset are
+    kept in a ring buffer (one array('d') each) and the tail is selected
+    when statistics() is called. Memory and snapshot cost stay bounded
+    (O(var_window) per asset) however long the service runs; until the
+    window fills up, the values equal the full-history batch statistics.
+    An exact tail over an unbounded stream would need the whole history,
+    and a streaming quantile sketch would only approximate VaR.
+    """
+
+    def __init__(self, assets, confidence=0.95, var_window=1000):
+        """
+        Args:
+            assets: List of asset names
+            confidence: VaR / CVaR confidence level
+            var_window: Number of most recent returns used for VaR / CVaR
+        """
+        if var_window < 1:
+            raise ValueError("var_window must be at least 1")
+        self.assets = list(assets)
+        self.n_assets = len(self.assets)
+        self.confidence = confidence
+        self.count = 0
+        self.means = [0.0] * self.n_assets
+        self.max_returns = [-math.inf] * self.n_assets
+        self.min_returns = [math.inf] * self.n_assets
+        # co_moments[i][j] = sum((x_i - mean_i) * (x_j - mean_j)) for j >= i
+        self.co_moments = [[0.0] * self.n_assets for _ in range(self.n_assets)]
+        # Third and fourth central moment sums (the second is co_moments[i][i])
+        self.m3 = [0.0] * self.n_assets
+        self.m4 = [0.0] * self.n_assets
+        # Compounded wealth, its running peak and the worst wealth / peak ratio
+        self.wealth = [1.0] * self.n_assets
+        self.peaks = [1.0] * self.n_assets
+        self.worst = [1.0] * self.n_assets
+        self.var_window = var_window
+        # Ring buffers: the return of observation t is at t % var_window
+        self.history = [array('d') for _ in range(self.n_assets)]
+
+    def update(self, values):
+        """
+        Add one observation per asset.
+
+        Args:
+            values: List of returns in the same order as self.assets
+        """
+        self.count += 1
+        n = self.count
+        old_deltas = []
+        new_deltas = []
+        for i, x in enumerate(values):
+            delta = x - self.means[i]
+            self.means[i] += delta / n
+            old_deltas.append(delta)
+            new_deltas.append(x - self.means[i])
+            if x > self.max_returns[i]:
+                self.max_returns[i] = x
+            if x < self.min_returns[i]:
+                self.min_returns[i] = x
+
+            # Higher moments (Pebay) - use M2 before this update
+            m2 = self.co_moments[i][i]
+            delta_n = delta / n
+            term = delta * delta_n * (n - 1)
+            self.m4[i] += (term * delta_n * delta_n * (n * n - 3 * n + 3)
+                           + 6 * delta_n * delta_n * m2 - 4 * delta_n * self.m3[i])
+            self.m3[i] += term * delta_n * (n - 2) - 3 * delta_n * m2
+
+            # Same arithmetic as risk_statistics.max_drawdown()
+            if self.worst[i] > 0:  # 0 once wiped out (drawdown stays 1.0)
+                wealth = self.wealth[i] = self.wealth[i] * (1 + x)
+                if wealth > self.peaks[i]:
+                    self.peaks[i] = wealth
+                elif wealth < self.peaks[i] * self.worst[i]:
+                    self.worst[i] = wealth / self.peaks[i] if wealth > 0 else 0.0
+            window = self.history[i]
+            if len(window) < self.var_window:
+                window.append(x)
+            else:
+                window[(n - 1) % self.var_window] = x
+
+        # C_ij += (x_i - old_mean_i) * (x_j - new_mean_j)
+        for i in range(self.n_assets):
+            row = self.co_moments[i]
+            d_i = old_deltas[i]
+            for j in range(i, self.n_assets):
+                row[j] += d_i * new_deltas[j]
+
+    def statistics(self):
+        """Per-asset statistics (same keys as PortfolioAnalyzer.portfolio_statistics)"""
+        stats = {}
+        for i, asset in enumerate(self.assets):
+            mean = self.means[i]
+            m2 = max(0.0, self.co_moments[i][i]) / self.count if self.count else 0.0
+            std = math.sqrt(m2)
+            value_at_risk, conditional_var = (tail_risk(self.history[i], self.confidence)
+                                              if self.count else (0.0, 0.0))
+            stats[asset] = {
+                'mean_return': mean,
+                'volatility': std,
+                'sharpe_approx': mean / std if std > 0 else 0,
+                'max_return': self.max_returns[i],
+                'min_return': self.min_returns[i],
+                'max_drawdown': 1 - self.worst[i],
+                'value_at_risk': value_at_risk,
+                'conditional_var': conditional_var,
+                'skewness': self.m3[i] / self.count / m2 ** 1.5 if m2 > 0 else 0.0,
+                'excess_kurtosis': self.m4[i] / self.count / (m2 * m2) - 3 if m2 > 0 else 0.0,
+            }
+        return stats
+
+    def correlation(self, i, j):
+        """Correlation between asset i and asset j (0.0 if undefined)"""
+        if i > j:
+            i, j = j, i
+        denominator = math.sqrt(self.co_moments[i][i] * self.co_moments[j][j])
+        if denominator == 0:
+            return 0.0
+        return self.co_moments[i][j] / denominator
+
+    def top_pairs(self, threshold=0.85, top=10):
+        """
+        Highly correlated pairs, like PortfolioAnalyzer.find_pairs_trading_candidates
+
+        Returns:
+            List of (asset1, asset2, correlation) tuples, highest first
+        """
+        pairs = []
+        for i in range(self.n_assets):
+            for j in range(i + 1, self.n_assets):
+                corr = self.correlation(i, j)
+                if corr >= threshold:
+                    pairs.append((self.assets[i], self.assets[j], corr))
+        pairs.sort(key=lambda x: x[2], reverse=True)
+        return pairs[:top]
+
+
+async def replay_feed(bars, delay=0.0):
+    """
+    Replay recorded bars as a feed (stand-in for a live source in tests).
+
+    Args:
+        bars: Iterable of {asset_name: return} dictionaries
+        delay: Seconds to wait between bars
+    """
+    for bar in bars:
+        yield bar
+        await asyncio.sleep(delay)
+
+
+async def file_tail_feed(path, poll_interval=0.5, from_start=True):
+    """
+    Follow a file of JSON lines ({asset_name: return} per line), like `tail -f`.
+
+    Runs until cancelled.
+    """
+    with open(path) as f:
+        if not from_start:
+            f.seek(0, 2)
+        while True:
+            line = f.readline()
+            if not line:
+                await asyncio.sleep(poll_interval)
+                continue
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+async def socket_feed(host, port):
+    """Read JSON lines ({asset_name: return} per line) from a TCP socket"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    finally:
+        writer.close()
+
+
+class MarketDataService:
+    """
+    Keep portfolio statistics live and serve snapshots to many clients.
+
+    Updates go through an asyncio.Queue; the consumer drains every queued
+    bar at once (coalescing bursts) and applies the batch in a worker thread.
+    Snapshots are cached per version, so concurrent clients share one
+    computation.
+    """
+
+    def __init__(self, assets, pairs_threshold=0.85, top_pairs=10, max_batch=10000,
+                 confidence=0.95, var_window=1000):
+        """
+        Args:
+            assets: List of asset names (order of the statistics)
+            pairs_threshold: Minimum correlation for the top pairs list
+            top_pairs: Number of pairs in each snapshot
+            max_batch: Maximum number of bars applied in one batch
+            confidence: VaR / CVaR confidence level
+            var_window: Number of most recent bars used for VaR / CVaR
+        """
+        self.stats = IncrementalStats(assets, confidence, var_window)
+        self.pairs_threshold = pairs_threshold
+        self.top_pairs = top_pairs
+        self.max_batch = max_batch
+        self.version = 0
+        self.dropped = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_task = None
+
+    def _apply(self, bars):
+        """Apply a batch of bars (runs in a worker thread)"""
+        assets = self.stats.assets
+        with self._lock:
+            for bar in bars:
+                try:
+                    values = [float(bar[asset]) for asset in assets]
+                except (KeyError, TypeError, ValueError):
+                    # Incomplete or malformed bar - co-moments need every asset
+                    self.dropped += 1
+                    continue
+                self.stats.update(values)
+            self.version += 1
+            self.batches += 1
+
+    def _build_snapshot(self):
+        """Compute a snapshot (runs in a worker thread)"""
+        with self._lock:
+            return {
+                'version': self.version,
+                'observations': self.stats.count,
+                'statistics': self.stats.statistics(),
+                'top_pairs': self.stats.top_pairs(self.pairs_threshold, self.top_pairs),
+            }
+
+    async def run(self, feed):
+        """
+        Consume a feed until it ends (or the task is cancelled).
+
+        Args:
+            feed: Async iterator of {asset_name: return} bars
+        """
+        queue = asyncio.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                async for bar in feed:
+                    await queue.put(bar)
+            finally:
+                await queue.put(done)
+
+        producer = asyncio.create_task(produce())
+        try:
+            finished = False
+            while not finished:
+                batch = [await queue.get()]
+                # Coalesce everything that arrived while we were busy
+                while not queue.empty() and len(batch) < self.max_batch:
+                    batch.append(queue.get_nowait())
+                if batch[-1] is done:
+                    batch.pop()
+                    finished = True
+                if batch:
+                    await asyncio.to_thread(self._apply, batch)
+            await producer
+        finally:
+            producer.cancel()
+
+    async def snapshot(self):
+        """
+        Current statistics and top pairs.
+
+        Returns:
+            Dictionary with 'version', 'observations', 'statistics', 'top_pairs'
+        """
+        if self._snapshot is not None and self._snapshot['version'] == self.version:
+            return self._snapshot
+        # Share one in-flight computation between concurrent clients
+        if self._snapshot_task is None or self._snapshot_task.done():
+            self._snapshot_task = asyncio.ensure_future(asyncio.to_thread(self._build_snapshot))
+        self._snapshot = await asyncio.shield(self._snapshot_task)
+        return self._snapshot
+
+    async def handle_client(self, reader, writer):
+        """Answer one JSON snapshot line per request line"""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                snapshot = await self.snapshot()
+                writer.write((json.dumps(snapshot) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765):
+        """Start a TCP server that serves snapshots as JSON lines"""
+        return await asyncio.start_server(self.handle_client, host, port)
@@ -0,0 +1,238 @@
+"""
+Walk-forward pairs-trading backtest - does the spread really mean-revert?
+Trains on one window, trades the following window out of sample, rolls on
+
+For every walk-forward window:
+1. Pairs are formed on the training window with
+   PortfolioAnalyzer.find_pairs_trading_candidates() (optionally kept only
+   if the spread passes the cointegration test from pairs_screening)
+2. Hedge ratio and spread volatility come from the training window
+3. On the test window the spread z-score drives the position: short the
+   spread above +entry_z, long below -entry_z, flat again inside ±exit_z
+
+Log prices of every asset are built once for the whole history and shared
+by all windows and pairs; windows run in a process pool.
+"""
+import math
+
+from pairs_screening import CRITICAL_VALUES, log_prices, screen_pair, hedge_regression
+from vector_basics import Vector
+from week1_miniproject import PortfolioAnalyzer
+
+
+def walk_forward_windows(n_obs, train_size, test_size, step=None):
+    """
+    Split n_obs periods into rolling (train, test) windows.
+
+    Args:
+        n_obs: Number of return observations
+        train_size: Periods used to form pairs
+        test_size: Periods traded out of sample
+        step: Periods between window starts (default: test_size, so the
+              test windows tile the history without overlap)
+
+    Returns:
+        List of (train_start, train_end, test_end) index tuples;
+        training is [train_start, train_end), testing [train_end, test_end)
+
+    Example:
+        >>> walk_forward_windows(10, 4, 3)
+        [(0, 4, 7), (3, 7, 10)]
+    """
+    if train_size < 3 or test_size < 1:
+        raise ValueError("train_size must be >= 3 and test_size >= 1")
+    step = step or test_size
+    windows = []
+    start = 0
+    while start + train_size + test_size <= n_obs:
+        windows.append((start, start + train_size, start + train_size + test_size))
+        start += step
+    return windows
+
+
+def trade_spread(spread, sigma, entry_z, exit_z, stop_z=None):
+    """
+    Simulate one pair on its out-of-sample spread.
+
+    The position (in units of the spread) is decided from the z-score at
+    each close and earns the spread change to the next close. Any open
+    position is closed at the end of the window.
+
+    Args:
+        spread: Spread levels (log prices), first value = last training close
+        sigma: Spread standard deviation from the training window
+        entry_z: Open a position when |z| exceeds this
+        exit_z: Close it when z comes back inside ±exit_z
+        stop_z: Close (and stay flat) when |z| exceeds this (None = no stop)
+
+    Returns:
+        Tuple (daily_pnl, trades, turnover)
+    """
+    position = 0
+    stopped = False
+    trades = 0
+    turnover = 0
+    pnl = []
+    for k in range(len(spread) - 1):
+        z = spread[k] / sigma
+        target = position
+        if stop_z is not None and abs(z) > stop_z:
+            target = 0
+            stopped = True
+        elif position == 0 and not stopped:
+            if z > entry_z:
+                target = -1
+            elif z < -entry_z:
+                target = 1
+        elif (position == 1 and z >= -exit_z) or (position == -1 and z <= exit_z):
+            target = 0
+        if target != position:
+            if target != 0:
+                trades += 1
+            turnover += abs(target - position)
+            position = target
+        pnl.append(position * (spread[k + 1] - spread[k]))
+    return pnl, trades, turnover + abs(position)
+
+
+# Per-process state for the pool workers (set once by the initializer)
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _run_window(window, options):
+    """Form pairs on the training part of a window and trade the test part"""
+    returns, prices = _worker_data
+    threshold, entry_z, exit_z, stop_z, critical_value = options
+    train_start, train_end, test_end = window
+
+    training = {a: Vector(r[train_start:train_end]) for a, r in returns.items()}
+    candidates = PortfolioAnalyzer(training).find_pairs_trading_candidates(threshold)
+
+    # Per-asset training quantities, shared by every pair that uses the asset
+    prepared = {}
+    for asset in {a for pair in candidates for a in pair[:2]}:
+        path = prices[asset][train_start:train_end + 1]
+        mean = sum(path) / len(path)
+        prepared[asset] = (path, mean, sum((p - mean) ** 2 for p in path))
+
+    results = []
+    for asset1, asset2, corr in candidates:
+        y, y_mean, _ = prepared[asset1]
+        x, x_mean, x_ss = prepared[asset2]
+        if critical_value is None:
+            hedge_ratio, intercept, _ = hedge_regression(y, y_mean, x, x_mean, x_ss)
+        else:
+            screened, _ = screen_pair(prepared, asset1, asset2, corr, -1.0, 0, critical_value)
+            if not screened['is_cointegrated']:
+                continue
+            hedge_ratio, intercept = screened['hedge_ratio'], screened['intercept']
+
+        residuals = [yi - intercept - hedge_ratio * xi for xi, yi in zip(x, y)]
+        sigma = math.sqrt(sum(r * r for r in residuals) / len(residuals))
+        if sigma == 0:
+            continue
+
+        y_test = prices[asset1][train_end:test_end + 1]
+        x_test = prices[asset2][train_end:test_end + 1]
+        spread = [yi - intercept - hedge_ratio * xi for xi, yi in zip(x_test, y_test)]
+        pnl, trades, turnover = trade_spread(spread, sigma, entry_z, exit_z, stop_z)
+        # Return on gross capital: 1 long leg + |hedge_ratio| short leg
+        gross = 1 + abs(hedge_ratio)
+        results.append({
+            'asset1': asset1,
+            'asset2': asset2,
+            'correlation': corr,
+            'hedge_ratio': hedge_ratio,
+            'daily_pnl': [p / gross for p in pnl],
+            'pnl': sum(pnl) / gross,
+            'trades': trades,
+            'turnover': turnover,
+        })
+
+    # Equal capital per pair; no pairs = flat
+    n_days = test_end - train_end
+    if results:
+        daily = [sum(day) / len(results) for day in zip(*(r['daily_pnl'] for r in results))]
+        turnover = sum(r['turnover'] for r in results) / len(results)
+    else:
+        daily = [0.0] * n_days
+        turnover = 0.0
+    for r in results:
+        del r['daily_pnl']
+
+    return {
+        'train': (train_start, train_end),
+        'test': (train_end, test_end),
+        'pairs': results,
+        'returns': daily,
+        'pnl': sum(daily),
+        'turnover': turnover,
+    }
+
+
+def walk_forward_backtest(returns_dict, train_size=60, test_size=20, step=None,
+                          threshold=0.85, entry_z=2.0, exit_z=0.5, stop_z=None,
+                          significance=None, workers=None, periods_per_year=252):
+    """
+    Walk-forward backtest of the z-score pairs-trading rule.
+
+    Args:
+        returns_dict: Dictionary of {asset_name: Vector of returns}
+        train_size, test_size, step: Window layout (see walk_forward_windows)
+        threshold: Minimum training correlation for a pair to be traded
+        entry_z, exit_z, stop_z: Trading rule thresholds (see trade_spread)
+        significance: If set ('1%', '5%', '10%'), only trade pairs whose
+                      training spread passes the cointegration test
+        workers: Number of worker processes (None/1 = run in this process)
+        periods_per_year: Used to annualize the Sharpe ratio
+
+    Returns:
+        Dictionary with:
+        - 'windows': per-window results (pairs traded, returns, pnl, turnover)
+        - 'returns': Vector of out-of-sample portfolio returns
+        - 'total_pnl', 'turnover', 'trades'
+        - 'sharpe': per-period Sharpe ratio, 'annualized_sharpe'
+    """
+    if significance is not None and significance not in CRITICAL_VALUES:
+        raise ValueError(f"significance must be one of {sorted(CRITICAL_VALUES)}")
+    if exit_z >= entry_z:
+        raise ValueError("exit_z must be smaller than entry_z")
+    critical_value = CRITICAL_VALUES[significance] if significance else None
+    options = (threshold, entry_z, exit_z, stop_z, critical_value)
+
+    n_obs = len(next(iter(returns_dict.values())))
+    windows = walk_forward_windows(n_obs, train_size, test_size, step)
+    data = ({a: list(r.components) for a, r in returns_dict.items()},
+            {a: log_prices(r, a) for a, r in returns_dict.items()})
+
+    if workers is None or workers <= 1 or len(windows) <= 1:
+        _init_worker(data)
+        try:
+            results = [_run_window(window, options) for window in windows]
+        finally:
+            _init_worker(None)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data,)) as pool:
+            chunksize = max(1, len(windows) // (4 * workers))
+            results = list(pool.map(_run_window, windows, [options] * len(windows),
+                                    chunksize=chunksize))
+
+    returns = Vector([r for window in results for r in window['returns']] or [0.0])
+    std = returns.std()
+    sharpe = returns.mean() / std if std > 0 else 0.0
+    return {
+        'windows': results,
+        'returns': returns,
+        'total_pnl': sum(w['pnl'] for w in results),
+        'turnover': sum(w['turnover'] for w in results),
+        'trades': sum(p['trades'] for w in results for p in w['pairs']),
+        'sharpe': sharpe,
+        'annualized_sharpe': sharpe * math.sqrt(periods_per_year),
+    }
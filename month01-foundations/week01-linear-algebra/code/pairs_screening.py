@@ -0,0 +1,220 @@
+"""
+Pairs-trading screen - cointegration tests on correlation-filtered pairs
+High correlation is not enough: the spread between the two prices has to
+mean-revert
+
+Pipeline for every candidate pair (cheapest checks first):
+1. Level correlation of the log prices (from precomputed per-asset sums)
+2. Hedge ratio by OLS and number of mean crossings of the spread
+3. Dickey-Fuller test on the spread + half-life of mean reversion
+
+Per-asset work (log prices, means, sums of squares) is done once and shared
+by every pair. Batches of pairs run in a process pool.
+"""
+import math
+
+# Engle-Granger critical values (2 variables, constant, large sample)
+CRITICAL_VALUES = {'1%': -3.90, '5%': -3.34, '10%': -3.04}
+
+
+def log_prices(returns, asset=None):
+    """
+    Cumulative log price path from simple returns (starts at 0).
+
+    Args:
+        returns: Vector of simple returns
+        asset: Asset name for error messages
+
+    Returns:
+        List of log prices, one longer than the returns
+
+    Raises:
+        ValueError: If a return is -100% or below (the price is wiped out
+                    and its log is undefined)
+    """
+    prices = [0.0]
+    level = 0.0
+    for t, r in enumerate(returns.components):
+        if not r > -1:
+            where = f" of {asset!r}" if asset is not None else ""
+            raise ValueError(f"Return {r} at index {t}{where} is -100% or below "
+                             f"(log price undefined)")
+        level += math.log1p(r)
+        prices.append(level)
+    return prices
+
+
+def prepare_assets(returns_dict):
+    """
+    Per-asset quantities shared by all pairs.
+
+    Returns:
+        Dictionary of {asset: (log_prices, mean, centered_sum_of_squares)}
+    """
+    prepared = {}
+    for asset, returns in returns_dict.items():
+        prices = log_prices(returns, asset)
+        mean = sum(prices) / len(prices)
+        ss = sum((p - mean) ** 2 for p in prices)
+        prepared[asset] = (prices, mean, ss)
+    return prepared
+
+
+def hedge_regression(y, y_mean, x, x_mean, x_ss):
+    """
+    OLS of y on x: y = intercept + hedge_ratio * x
+
+    Returns:
+        Tuple (hedge_ratio, intercept, s_xy)
+    """
+    s_xy = sum((xi - x_mean) * yi for xi, yi in zip(x, y))
+    hedge_ratio = s_xy / x_ss if x_ss > 0 else 0.0
+    return hedge_ratio, y_mean - hedge_ratio * x_mean, s_xy
+
+
+def mean_crossings(spread):
+    """Number of times a zero-mean spread changes sign"""
+    crossings = 0
+    previous = spread[0] >= 0
+    for s in spread:
+        current = s >= 0
+        if current != previous:
+            crossings += 1
+            previous = current
+    return crossings
+
+
+def dickey_fuller(spread):
+    """
+    Dickey-Fuller regression: Δs_t = a + γ·s_(t-1) + e_t
+
+    Returns:
+        Tuple (t_statistic, gamma, half_life). half_life is the number of
+        periods for a deviation to halve (inf if the spread does not revert).
+    """
+    lagged = spread[:-1]
+    diffs = [spread[t + 1] - spread[t] for t in range(len(lagged))]
+    n = len(lagged)
+    if n < 3:
+        return 0.0, 0.0, math.inf
+    lag_mean = sum(lagged) / n
+    diff_mean = sum(diffs) / n
+    s_xx = sum((s - lag_mean) ** 2 for s in lagged)
+    if s_xx == 0:
+        return 0.0, 0.0, math.inf
+    s_xy = sum((s - lag_mean) * d for s, d in zip(lagged, diffs))
+    gamma = s_xy / s_xx
+    intercept = diff_mean - gamma * lag_mean
+
+    rss = sum((d - intercept - gamma * s) ** 2 for s, d in zip(lagged, diffs))
+    sigma2 = rss / (n - 2)
+    if sigma2 == 0:
+        t_stat = -math.inf if gamma < 0 else 0.0
+    else:
+        t_stat = gamma / math.sqrt(sigma2 / s_xx)
+    half_life = -math.log(2) / gamma if gamma < 0 else math.inf
+    return t_stat, gamma, half_life
+
+
+def screen_pair(prepared, asset1, asset2, correlation, min_level_corr, min_crossings, critical_value):
+    """
+    Run the screening pipeline on one pair.
+
+    Returns:
+        (result_dict, None) if the pair was tested, (None, stage) if it was
+        pruned at a cheap stage
+    """
+    y, y_mean, y_ss = prepared[asset1]
+    x, x_mean, x_ss = prepared[asset2]
+
+    hedge_ratio, intercept, s_xy = hedge_regression(y, y_mean, x, x_mean, x_ss)
+    level_corr = s_xy / math.sqrt(x_ss * y_ss) if x_ss > 0 and y_ss > 0 else 0.0
+    if level_corr < min_level_corr:
+        return None, 'level_correlation'
+
+    spread = [yi - intercept - hedge_ratio * xi for xi, yi in zip(x, y)]
+    if mean_crossings(spread) < min_crossings:
+        return None, 'crossings'
+
+    adf_stat, gamma, half_life = dickey_fuller(spread)
+    return {
+        'asset1': asset1,
+        'asset2': asset2,
+        'correlation': correlation,
+        'hedge_ratio': hedge_ratio,
+        'intercept': intercept,
+        'adf_stat': adf_stat,
+        'half_life': half_life,
+        'is_cointegrated': adf_stat < critical_value
+    }, None
+
+
+# Per-process state for the pool workers (set once by the initializer)
+_worker_assets = None
+
+
+def _init_worker(prepared):
+    global _worker_assets
+    _worker_assets = prepared
+
+
+def _screen_batch(batch, options):
+    results = []
+    pruned = {}
+    for asset1, asset2, corr in batch:
+        result, stage = screen_pair(_worker_assets, asset1, asset2, corr, *options)
+        if result is None:
+            pruned[stage] = pruned.get(stage, 0) + 1
+        else:
+            results.append(result)
+    return results, pruned
+
+
+def screen_pairs(returns_dict, candidates, significance='5%', min_level_corr=0.5,
+                 min_crossings=4, workers=None, batch_size=500):
+    """
+    Screen correlation-filtered pairs for cointegration.
+
+    Args:
+        returns_dict: Dictionary of {asset_name: Vector of returns}
+        candidates: List of (asset1, asset2, correlation) tuples, e.g. from
+                    PortfolioAnalyzer.find_pairs_trading_candidates()
+        significance: '1%', '5%' or '10%' critical value of the ADF test
+        min_level_corr: Prune pairs whose log prices correlate less than this
+        min_crossings: Prune spreads that cross their mean fewer times
+        workers: Number of worker processes (None/1 = run in this process)
+        batch_size: Pairs per task sent to a worker
+
+    Returns:
+        Dictionary with 'pairs' (results sorted by ADF statistic, most
+        stationary first), 'tested' and 'pruned' counts per stage
+    """
+    if significance not in CRITICAL_VALUES:
+        raise ValueError(f"significance must be one of {sorted(CRITICAL_VALUES)}")
+    options = (min_level_corr, min_crossings, CRITICAL_VALUES[significance])
+
+    used_assets = {a for pair in candidates for a in pair[:2]}
+    prepared = prepare_assets({a: returns_dict[a] for a in used_assets})
+    batches = [candidates[k:k + batch_size] for k in range(0, len(candidates), batch_size)]
+
+    if workers is None or workers <= 1 or len(batches) <= 1:
+        _init_worker(prepared)
+        try:
+            outputs = [_screen_batch(batch, options) for batch in batches]
+        finally:
+            _init_worker(None)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(prepared,)) as pool:
+            outputs = list(pool.map(_screen_batch, batches, [options] * len(batches)))
+
+    pairs = []
+    pruned = {'level_correlation': 0, 'crossings': 0}
+    for results, batch_pruned in outputs:
+        pairs.extend(results)
+        for stage, count in batch_pruned.items():
+            pruned[stage] += count
+
+    pairs.sort(key=lambda x: x['adf_stat'])
+    return {'pairs': pairs, 'tested': len(pairs), 'pruned': pruned}
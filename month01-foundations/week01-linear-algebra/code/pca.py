@@ -0,0 +1,191 @@
+"""
+PCA / statistical factors of a return universe - truncated randomized solver
+Pulls out the market factor and the next few factors without ever forming
+the N x N covariance matrix
+
+Randomized subspace iteration (Halko, Martinsson & Tropp, 2011): multiply a
+few random directions by the covariance operator C = X X^T / T (two passes
+over the N x T return matrix each time), orthonormalize, repeat, then solve
+a tiny (k + oversample) eigenproblem. Cost is O(N * T * k) instead of O(N³).
+"""
+import math
+import operator
+import random
+
+from vector_basics import Vector
+
+
+def _orthonormalize(columns):
+    """
+    Modified Gram-Schmidt, applied twice for stability.
+
+    Args:
+        columns: List of vectors (lists of length N)
+
+    Returns:
+        List of orthonormal vectors (dependent columns are dropped)
+    """
+    mul = operator.mul
+    basis = []
+    for column in columns:
+        v = list(column)
+        for _ in range(2):
+            for q in basis:
+                proj = sum(map(mul, q, v))
+                v = [vi - proj * qi for vi, qi in zip(v, q)]
+        norm = math.sqrt(sum(map(mul, v, v)))
+        if norm > 1e-12:
+            basis.append([vi / norm for vi in v])
+    return basis
+
+
+def _apply_covariance(rows, v, t_obs):
+    """C v = X (X^T v) / T for rows = de-meaned returns (N x T)"""
+    mul = operator.mul
+    xt_v = [0.0] * t_obs
+    for weight, row in zip(v, rows):
+        if weight != 0:
+            xt_v = [acc + weight * x for acc, x in zip(xt_v, row)]
+    return [sum(map(mul, row, xt_v)) / t_obs for row in rows]
+
+
+def jacobi_eigen(matrix, tolerance=1e-12, max_sweeps=100):
+    """
+    Eigen-decomposition of a small symmetric matrix (cyclic Jacobi).
+
+    Stops when the off-diagonal norm is below tolerance * matrix norm.
+
+    Returns:
+        Tuple (eigenvalues, eigenvectors), sorted by eigenvalue descending;
+        eigenvectors[k] is the k-th eigenvector
+    """
+    n = len(matrix)
+    a = [list(row) for row in matrix]
+    v = [[1.0 if i == j else 0.0 for j in range(n)] for i in range(n)]
+    # Relative tolerance: returns covariances are tiny (~1e-4)
+    scale = sum(x * x for row in a for x in row)
+
+    for _ in range(max_sweeps):
+        off = sum(a[i][j] ** 2 for i in range(n) for j in range(n) if i != j)
+        if off <= tolerance * tolerance * scale:
+            break
+        for p in range(n):
+            for q in range(p + 1, n):
+                if abs(a[p][q]) < 1e-300:
+                    continue
+                theta = (a[q][q] - a[p][p]) / (2 * a[p][q])
+                t = math.copysign(1.0, theta) / (abs(theta) + math.sqrt(theta * theta + 1))
+                c = 1 / math.sqrt(t * t + 1)
+                s = t * c
+                for k in range(n):
+                    akp, akq = a[k][p], a[k][q]
+                    a[k][p] = c * akp - s * akq
+                    a[k][q] = s * akp + c * akq
+                for k in range(n):
+                    apk, aqk = a[p][k], a[q][k]
+                    a[p][k] = c * apk - s * aqk
+                    a[q][k] = s * apk + c * aqk
+                for k in range(n):
+                    vkp, vkq = v[k][p], v[k][q]
+                    v[k][p] = c * vkp - s * vkq
+                    v[k][q] = s * vkp + c * vkq
+
+    order = sorted(range(n), key=lambda k: a[k][k], reverse=True)
+    eigenvalues = [a[k][k] for k in order]
+    eigenvectors = [[v[i][k] for i in range(n)] for k in order]
+    return eigenvalues, eigenvectors
+
+
+def top_eigenvectors(rows, n_factors, oversample=5, n_iter=3, seed=0):
+    """
+    Top eigenvectors of the covariance of de-meaned rows.
+
+    Args:
+        rows: De-meaned returns, N lists of length T
+        n_factors: Number of eigenvectors (k)
+        oversample: Extra random directions for accuracy
+        n_iter: Subspace (power) iterations - more for slowly decaying spectra
+        seed: Random seed (results are reproducible)
+
+    Returns:
+        Tuple (eigenvalues, eigenvectors) - k values, k vectors of length N
+    """
+    n = len(rows)
+    t_obs = len(rows[0])
+    size = min(n, n_factors + oversample)
+    rng = random.Random(seed)
+
+    basis = _orthonormalize([[rng.gauss(0, 1) for _ in range(n)] for _ in range(size)])
+    basis = _orthonormalize([_apply_covariance(rows, q, t_obs) for q in basis])
+    for _ in range(n_iter):
+        basis = _orthonormalize([_apply_covariance(rows, q, t_obs) for q in basis])
+
+    # Project the operator onto the subspace: B = Q^T C Q (size x size)
+    mul = operator.mul
+    applied = [_apply_covariance(rows, q, t_obs) for q in basis]
+    small = [[sum(map(mul, qi, cq)) for cq in applied] for qi in basis]
+    small = [[(small[i][j] + small[j][i]) / 2 for j in range(len(basis))]
+             for i in range(len(basis))]
+    eigenvalues, small_vectors = jacobi_eigen(small)
+
+    vectors = []
+    for w in small_vectors[:n_factors]:
+        vector = [sum(wk * q[i] for wk, q in zip(w, basis)) for i in range(n)]
+        # Sign convention: loadings sum to a positive number (market factor > 0)
+        if sum(vector) < 0:
+            vector = [-x for x in vector]
+        vectors.append(vector)
+    return eigenvalues[:n_factors], vectors
+
+
+def factor_decomposition(returns_dict, n_factors=1, oversample=5, n_iter=3, seed=0):
+    """
+    Statistical factor model of a universe: r = mean + loadings · factors + residual
+
+    Args:
+        returns_dict: Dictionary of {asset_name: Vector of returns}
+        n_factors: Number of factors to extract
+        oversample, n_iter, seed: Randomized solver settings
+
+    Returns:
+        Dictionary with:
+        - 'loadings': {asset: [loading on factor 1, ..., factor k]}
+        - 'factor_returns': list of k Vectors (length T)
+        - 'explained_variance': variance of each factor (eigenvalues)
+        - 'explained_variance_ratio': share of total variance per factor
+        - 'residuals': {asset: Vector} factor-neutral returns (mean kept)
+    """
+    assets = list(returns_dict.keys())
+    means = [returns_dict[a].mean() for a in assets]
+    rows = [returns_dict[a].de_mean().components for a in assets]
+    t_obs = len(rows[0])
+    n_factors = min(n_factors, len(assets))
+
+    eigenvalues, loadings = top_eigenvectors(rows, n_factors, oversample, n_iter, seed)
+    total_variance = sum(sum(x * x for x in row) for row in rows) / t_obs
+
+    # Factor returns f_k = L_k^T X, residuals = X - sum_k L_k f_k
+    factors = []
+    for loading in loadings:
+        f = [0.0] * t_obs
+        for weight, row in zip(loading, rows):
+            f = [acc + weight * x for acc, x in zip(f, row)]
+        factors.append(f)
+
+    residuals = {}
+    for i, asset in enumerate(assets):
+        residual = list(rows[i])
+        for loading, f in zip(loadings, factors):
+            weight = loading[i]
+            residual = [r - weight * x for r, x in zip(residual, f)]
+        residuals[asset] = Vector([r + means[i] for r in residual])
+
+    return {
+        'assets': assets,
+        'loadings': {asset: [loading[i] for loading in loadings] for i, asset in enumerate(assets)},
+        'factor_returns': [Vector(f) for f in factors],
+        'explained_variance': eigenvalues,
+        'explained_variance_ratio': [ev / total_variance if total_variance > 0 else 0.0
+                                     for ev in eigenvalues],
+        'residuals': residuals,
+    }
@@ -0,0 +1,195 @@
+"""
+Profiling hooks - opt-in operation counters for Vector and PortfolioAnalyzer
+Shows which calls dominate a run and how many temporary Vectors get allocated
+
+Zero cost when disabled: the classes are only wrapped while a Profiler is
+active, and the original methods are restored on exit.
+
+Example:
+    >>> with Profiler() as prof:
+    ...     analyzer.generate_insights()
+    >>> prof.hot_spots(top=3)
+    >>> prof.to_prometheus('metrics.prom')
+"""
+import functools
+import json
+import time
+
+from vector_basics import Vector
+
+VECTOR_METHODS = (
+    'add', 'scalar_multiply', 'dot', 'norm', 'angle_with', 'is_orthogonal',
+    'projection_onto', '__sub__', 'rms', 'distance', 'mean', 'de_mean',
+    'std', 'standardize', 'correlation_with',
+)
+
+ANALYZER_METHODS = (
+    'correlation_matrix', 'find_best_diversification_pairs',
+    'find_pairs_trading_candidates', 'portfolio_statistics',
+    'hierarchical_clusters', 'generate_insights',
+)
+
+
+def default_targets():
+    """
+    Classes and method names instrumented by default.
+
+    Returns:
+        List of (class, method_names) tuples
+    """
+    # Imported here so profiling Vector alone never loads the analyzer
+    from week1_miniproject import PortfolioAnalyzer
+    return [(Vector, VECTOR_METHODS), (PortfolioAnalyzer, ANALYZER_METHODS)]
+
+
+def _elements_of(obj):
+    """Number of elements a method call works on"""
+    if isinstance(obj, Vector):
+        return len(obj.components)
+    returns = getattr(obj, 'returns', None)
+    if isinstance(returns, dict):
+        return sum(len(v.components) for v in returns.values())
+    return 0
+
+
+class Profiler:
+    """
+    Count calls, elements, Vector allocations and wall time per method.
+
+    Allocations and wall time are inclusive: a Vector created inside
+    `std()` by `de_mean()` counts for both methods. Not thread-safe - use
+    one Profiler at a time.
+    """
+
+    def __init__(self, targets=None):
+        """
+        Args:
+            targets: List of (class, method_names) tuples to instrument
+                     (default: Vector and PortfolioAnalyzer hot paths)
+        """
+        self.targets = targets
+        self.stats = {}
+        self.allocations = 0
+        self._originals = []
+        self._stack = []
+
+    def _record(self, name):
+        if name not in self.stats:
+            self.stats[name] = {'calls': 0, 'elements': 0, 'allocations': 0, 'seconds': 0.0}
+        return self.stats[name]
+
+    def _wrap(self, name, method):
+        profiler = self
+
+        @functools.wraps(method)
+        def wrapper(obj, *args, **kwargs):
+            record = profiler._record(name)
+            record['calls'] += 1
+            record['elements'] += _elements_of(obj)
+            profiler._stack.append(record)
+            start = time.perf_counter()
+            try:
+                return method(obj, *args, **kwargs)
+            finally:
+                record['seconds'] += time.perf_counter() - start
+                profiler._stack.pop()
+        return wrapper
+
+    def _wrap_init(self, init):
+        profiler = self
+
+        @functools.wraps(init)
+        def wrapper(obj, *args, **kwargs):
+            profiler.allocations += 1
+            # Credit each active method once (recursion safe)
+            for record in {id(r): r for r in profiler._stack}.values():
+                record['allocations'] += 1
+            return init(obj, *args, **kwargs)
+        return wrapper
+
+    def start(self):
+        """Install the instrumentation"""
+        if self._originals:
+            return self
+        targets = self.targets if self.targets is not None else default_targets()
+        for cls, names in targets:
+            for attr in names:
+                if attr not in cls.__dict__:
+                    continue
+                original = cls.__dict__[attr]
+                self._originals.append((cls, attr, original))
+                setattr(cls, attr, self._wrap(f"{cls.__name__}.{attr}", original))
+        original_init = Vector.__dict__['__init__']
+        self._originals.append((Vector, '__init__', original_init))
+        Vector.__init__ = self._wrap_init(original_init)
+        return self
+
+    def stop(self):
+        """Restore the original methods"""
+        while self._originals:
+            cls, attr, original = self._originals.pop()
+            setattr(cls, attr, original)
+        return self
+
+    def reset(self):
+        """Clear collected counters"""
+        self.stats = {}
+        self.allocations = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    def snapshot(self):
+        """
+        Copy of the counters collected so far.
+
+        Returns:
+            Dictionary of {method_name: {'calls', 'elements', 'allocations', 'seconds'}}
+        """
+        return {name: dict(record) for name, record in self.stats.items()}
+
+    def hot_spots(self, top=5, key='seconds'):
+        """
+        Most expensive methods.
+
+        Args:
+            top: Number of methods to return
+            key: Counter to sort by ('seconds', 'calls', 'elements', 'allocations')
+
+        Returns:
+            List of (method_name, counters) tuples, most expensive first
+        """
+        ranked = sorted(self.snapshot().items(), key=lambda x: x[1][key], reverse=True)
+        return ranked[:top]
+
+    def to_json(self, path):
+        """Write counters to a local JSON file"""
+        with open(path, 'w') as f:
+            json.dump({'total_allocations': self.allocations, 'methods': self.snapshot()},
+                      f, indent=2, sort_keys=True)
+
+    def to_prometheus(self, path, prefix='trading'):
+        """Write counters in the Prometheus text exposition format"""
+        metrics = [
+            ('calls', 'calls_total', 'counter', 'Number of calls per method'),
+            ('elements', 'elements_total', 'counter', 'Vector elements processed per method'),
+            ('allocations', 'allocations_total', 'counter', 'Vectors allocated inside each method'),
+            ('seconds', 'seconds_total', 'counter', 'Inclusive wall time per method'),
+        ]
+        lines = []
+        snapshot = self.snapshot()
+        for key, suffix, kind, help_text in metrics:
+            metric = f"{prefix}_method_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name in sorted(snapshot):
+                lines.append(f'{metric}{{method="{name}"}} {snapshot[name][key]}')
+        lines.append(f"# HELP {prefix}_vector_allocations_total Vectors allocated while profiling")
+        lines.append(f"# TYPE {prefix}_vector_allocations_total counter")
+        lines.append(f"{prefix}_vector_allocations_total {self.allocations}")
+        with open(path, 'w') as f:
+            f.write("\n".join(lines) + "\n")
@@ -0,0 +1,359 @@
+"""
+Market regime similarity search - "when did the market last look like today?"
+Scales the Day 3 regime vectors up to every rolling window in the history
+
+Pipeline:
+1. rolling_features(): volatility, trend strength, volume ratio and
+   correlations for every window, from prefix sums (O(1) per window, all
+   windows computed together with builtin map / accumulate)
+2. FeatureScaler: z-score the features with statistics fitted once on the
+   history and stored with the index, so queries use the same scaling
+3. KDTree: nearest-neighbour index over the standardized features,
+   saved to / loaded from a single binary file
+
+Example:
+    >>> index = RegimeIndex.build(spy_returns, window=20, volume=spy_volume,
+    ...                           others={'TLT': tlt_returns})
+    >>> index.save('regimes.idx')
+    >>> RegimeIndex.load('regimes.idx').similar(k=5)   # Windows most like today
+    [(2915, 0.21...), (812, 0.34...), ...]
+"""
+import heapq
+import json
+import math
+import operator
+import os
+import struct
+from array import array
+from itertools import accumulate
+
+MAGIC = b'REGIDX01'
+HEADER = struct.Struct('=8sQQQQ')
+
+
+def _window_sums(values, window):
+    """Sum of every window of consecutive values; entry k ends at k + window - 1"""
+    prefix = list(accumulate(values, initial=0.0))
+    return list(map(operator.sub, prefix[window:], prefix[:-window]))
+
+
+def rolling_features(returns, window, volume=None, volume_lookback=None, others=None):
+    """
+    Regime features for every rolling window of a return series.
+
+    Features (in this order):
+    - volatility: standard deviation of the returns in the window
+    - trend_strength: sum(r) / sum(|r|), from -1 (straight down) to 1
+    - volume_ratio: average volume in the window / average volume over the
+      volume_lookback periods ending with it (only if volume is given)
+    - corr_<asset>: correlation with each of the other return series
+
+    Args:
+        returns: Vector of returns (e.g. the market index)
+        window: Periods per window
+        volume: Optional Vector of volumes, same length as returns
+        volume_lookback: Periods for the volume baseline (default 5 * window)
+        others: Optional {asset_name: Vector of returns} for correlations
+
+    Returns:
+        Dictionary with 'names' (feature names), 'ends' (index of the last
+        period of each window) and 'rows' (one feature list per window)
+    """
+    r = list(returns.components)
+    n = len(r)
+    others = others or {}
+    lookback = window
+    if volume is not None:
+        volume_lookback = volume_lookback or 5 * window
+        lookback = max(window, volume_lookback)
+    if window < 2 or lookback > n:
+        raise ValueError(f"Need 2 <= window and at least {lookback} observations, got {n}")
+    mul = operator.mul
+    skip = lookback - window  # Windows dropped so every feature is defined
+
+    s1 = _window_sums(r, window)[skip:]
+    s2 = _window_sums(list(map(mul, r, r)), window)[skip:]
+    s_abs = _window_sums(list(map(abs, r)), window)[skip:]
+    means = [s / window for s in s1]
+    variances = [max(q / window - m * m, 0.0) for q, m in zip(s2, means)]
+
+    names = ['volatility', 'trend_strength']
+    columns = [list(map(math.sqrt, variances)),
+               [s / a if a > 0 else 0.0 for s, a in zip(s1, s_abs)]]
+
+    if volume is not None:
+        v = list(volume.components)
+        short = _window_sums(v, window)[skip:]
+        long = _window_sums(v, volume_lookback)[lookback - volume_lookback:]
+        names.append('volume_ratio')
+        columns.append([(s / window) / (l / volume_lookback) if l > 0 else 1.0
+                        for s, l in zip(short, long)])
+
+    for asset, other in others.items():
+        y = list(other.components)
+        if len(y) != n:
+            raise ValueError(f"{asset} has {len(y)} observations, expected {n}")
+        t1 = _window_sums(y, window)[skip:]
+        t2 = _window_sums(list(map(mul, y, y)), window)[skip:]
+        cross = _window_sums(list(map(mul, r, y)), window)[skip:]
+        column = []
+        for m, var_x, sy, syy, sxy in zip(means, variances, t1, t2, cross):
+            my = sy / window
+            var_y = max(syy / window - my * my, 0.0)
+            denominator = math.sqrt(var_x * var_y)
+            column.append((sxy / window - m * my) / denominator if denominator > 0 else 0.0)
+        names.append(f"corr_{asset}")
+        columns.append(column)
+
+    return {
+        'names': names,
+        'ends': list(range(lookback - 1, n)),
+        'rows': [list(row) for row in zip(*columns)],
+    }
+
+
+class FeatureScaler:
+    """Z-score features with statistics fitted once and reused for queries"""
+
+    def __init__(self, means, stds):
+        self.means = list(means)
+        self.stds = list(stds)
+
+    @classmethod
+    def fit(cls, rows):
+        """Per-feature mean and standard deviation of the rows"""
+        n = len(rows)
+        columns = list(zip(*rows))
+        means = [math.fsum(c) / n for c in columns]
+        stds = [math.sqrt(math.fsum((x - m) ** 2 for x in c) / n) for c, m in zip(columns, means)]
+        # Constant features carry no information: leave them at zero
+        return cls(means, [s if s > 0 else 1.0 for s in stds])
+
+    def transform(self, row):
+        return [(x - m) / s for x, m, s in zip(row, self.means, self.stds)]
+
+
+class KDTree:
+    """
+    k-d tree for exact nearest-neighbour queries in a few dimensions.
+
+    Points are stored flat, in tree order, so a leaf is a contiguous slice
+    and the whole tree is a handful of arrays (cheap to save and load).
+    """
+
+    def __init__(self, points, ids, split_dims, split_values, children, bounds, dim):
+        self.points = points          # array('d'), n * dim
+        self.ids = ids                # array('q'), point id in tree order
+        self.split_dims = split_dims  # array('q'), -1 for leaves
+        self.split_values = split_values
+        self.children = children      # array('q'), left, right per node
+        self.bounds = bounds          # array('q'), start, end per node
+        self.dim = dim
+
+    @classmethod
+    def build(cls, points, ids=None, leaf_size=16):
+        """
+        Args:
+            points: List of equal-length coordinate lists
+            ids: Integer id per point (default: position in points)
+            leaf_size: Maximum points per leaf
+        """
+        dim = len(points[0])
+        ids = list(range(len(points))) if ids is None else list(ids)
+        order = list(range(len(points)))
+        split_dims, split_values = array('q'), array('d')
+        children, bounds = array('q'), array('q')
+
+        def build_node(lo, hi):
+            node = len(split_dims)
+            split_dims.append(-1)
+            split_values.append(0.0)
+            children.extend((-1, -1))
+            bounds.extend((lo, hi))
+            if hi - lo <= leaf_size:
+                return node
+            # Split the widest dimension at the median
+            spreads = [max(points[i][d] for i in order[lo:hi]) - min(points[i][d] for i in order[lo:hi])
+                       for d in range(dim)]
+            axis = spreads.index(max(spreads))
+            order[lo:hi] = sorted(order[lo:hi], key=lambda i: points[i][axis])
+            mid = (lo + hi) // 2
+            split_dims[node] = axis
+            split_values[node] = points[order[mid]][axis]
+            children[2 * node] = build_node(lo, mid)
+            children[2 * node + 1] = build_node(mid, hi)
+            return node
+
+        build_node(0, len(points))
+        flat = array('d', [x for i in order for x in points[i]])
+        return cls(flat, array('q', [ids[i] for i in order]), split_dims, split_values,
+                   children, bounds, dim)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def query(self, point, k=5, before=None):
+        """
+        The k nearest points (Euclidean distance).
+
+        Args:
+            point: Coordinates
+            k: Number of neighbours
+            before: Only consider points whose id is smaller than this
+
+        Returns:
+            List of (id, distance), nearest first
+        """
+        dim = self.dim
+        points, ids = self.points, self.ids
+        split_dims, split_values = self.split_dims, self.split_values
+        children, bounds = self.children, self.bounds
+        heap = []  # (-distance², id): worst of the current best k on top
+        stack = [(0, 0.0)]
+        while stack:
+            node, min_d2 = stack.pop()
+            if len(heap) == k and min_d2 >= -heap[0][0]:
+                continue
+            axis = split_dims[node]
+            if axis < 0:
+                for i in range(bounds[2 * node], bounds[2 * node + 1]):
+                    point_id = ids[i]
+                    if before is not None and point_id >= before:
+                        continue
+                    base = i * dim
+                    d2 = 0.0
+                    for j in range(dim):
+                        diff = points[base + j] - point[j]
+                        d2 += diff * diff
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d2, point_id))
+                    elif d2 < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d2, point_id))
+                continue
+            diff = point[axis] - split_values[node]
+            near, far = (children[2 * node], children[2 * node + 1]) if diff < 0 else \
+                        (children[2 * node + 1], children[2 * node])
+            stack.append((far, max(min_d2, diff * diff)))  # Visited last
+            stack.append((near, min_d2))
+        return [(point_id, math.sqrt(-neg_d2)) for neg_d2, point_id in sorted(heap, reverse=True)]
+
+
+class RegimeIndex:
+    """
+    Standardized regime features of every historical window plus a k-d tree.
+
+    Window ids are the index of the window's last period, so a query for
+    today can exclude every window that overlaps with today's.
+    """
+
+    def __init__(self, names, window, scaler, tree, rows):
+        self.names = names
+        self.window = window
+        self.scaler = scaler
+        self.tree = tree
+        self.rows = rows  # {window end: raw feature list}
+
+    @classmethod
+    def build(cls, returns, window=20, volume=None, volume_lookback=None, others=None,
+              leaf_size=16):
+        """Compute the features of every window and index them (see rolling_features)"""
+        features = rolling_features(returns, window, volume, volume_lookback, others)
+        scaler = FeatureScaler.fit(features['rows'])
+        tree = KDTree.build([scaler.transform(row) for row in features['rows']],
+                            features['ends'], leaf_size)
+        return cls(features['names'], window, scaler, tree,
+                   dict(zip(features['ends'], features['rows'])))
+
+    @property
+    def latest(self):
+        """End of the most recent indexed window"""
+        return max(self.rows)
+
+    def query(self, features, k=5, before=None):
+        """
+        Past windows closest to a raw (unscaled) feature vector.
+
+        Args:
+            features: Feature values in the order of self.names
+            k: Number of windows
+            before: Only windows ending before this period
+
+        Returns:
+            List of (window end, distance in standardized units), nearest first
+        """
+        if len(features) != len(self.names):
+            raise ValueError(f"Expected {len(self.names)} features: {self.names}")
+        return self.tree.query(self.scaler.transform(features), k, before)
+
+    def similar(self, end=None, k=5, distinct=True):
+        """
+        Windows most similar to the one ending at `end` (default: today),
+        excluding windows that overlap with it or lie in its future.
+
+        Args:
+            end: Window end to compare against
+            k: Number of windows
+            distinct: Skip matches that overlap a closer match, so the
+                      result lists k different episodes
+
+        Returns:
+            List of (window end, distance), nearest first
+        """
+        end = self.latest if end is None else end
+        before = end - self.window + 1
+        if not distinct:
+            return self.query(self.rows[end], k, before)
+
+        wanted = k
+        while True:
+            matches = self.query(self.rows[end], wanted, before)
+            selected = []
+            for match in matches:
+                if all(abs(match[0] - other[0]) >= self.window for other in selected):
+                    selected.append(match)
+                    if len(selected) == k:
+                        return selected
+            if len(matches) < wanted:
+                return selected  # Ran out of history
+            wanted *= 4
+
+    def save(self, path):
+        """Write the index to one file (atomically: temp file + rename)"""
+        meta = json.dumps({
+            'names': self.names,
+            'window': self.window,
+            'means': self.scaler.means,
+            'stds': self.scaler.stds,
+            'ends': list(self.rows),
+        }).encode()
+        tree = self.tree
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(tree), tree.dim, len(tree.split_dims), len(meta)))
+            f.write(meta)
+            array('d', [x for row in self.rows.values() for x in row]).tofile(f)
+            for part in (tree.points, tree.ids, tree.split_dims, tree.split_values,
+                         tree.children, tree.bounds):
+                part.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save()"""
+        with open(path, 'rb') as f:
+            magic, n, dim, n_nodes, meta_size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a regime index file")
+            meta = json.loads(f.read(meta_size))
+
+            def read(typecode, count):
+                part = array(typecode)
+                part.fromfile(f, count)
+                return part
+
+            raw = read('d', n * dim)
+            tree = KDTree(read('d', n * dim), read('q', n), read('q', n_nodes),
+                          read('d', n_nodes), read('q', 2 * n_nodes), read('q', 2 * n_nodes), dim)
+        rows = {end: raw[k * dim:(k + 1) * dim].tolist() for k, end in enumerate(meta['ends'])}
+        return cls(meta['names'], meta['window'], FeatureScaler(meta['means'], meta['stds']),
+                   tree, rows)
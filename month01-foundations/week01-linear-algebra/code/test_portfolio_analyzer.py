@@ -0,0 +1,561 @@
+"""
+Test suite for PortfolioAnalyzer extensions - Week 1 miniproject
+Run with: python test_portfolio_analyzer.py
+"""
+
+from vector_basics import Vector
+from week1_miniproject import PortfolioAnalyzer
+from clustering import linkage_tree, quasi_diagonal_order, cut_tree
+from profiling import Profiler
+from market_service import IncrementalStats, MarketDataService, replay_feed
+from corr_cache import CorrelationCache
+from pairs_screening import screen_pairs
+from shared_returns import SharedReturns, SharedReturnsPublisher
+from risk_statistics import asset_statistics, max_drawdown, smallest
+from regime_search import RegimeIndex, rolling_features
+from correlation_stability import chi2_sf
+from pairs_backtest import trade_spread, walk_forward_windows, walk_forward_backtest
+from bench_import import BUDGETS_MS, check_import
+import batch_cli
+import asyncio
+import json
+import math
+import os
+import random
+import tempfile
+
+# Two equity-like assets, two bond-like assets (moving against equities)
+SAMPLE_RETURNS = {
+    'SPY': Vector([0.01, -0.02, 0.015, -0.01, 0.02, -0.015, 0.005, 0.01, -0.01, 0.02]),
+    'QQQ': Vector([0.012, -0.025, 0.018, -0.008, 0.025, -0.012, 0.008, 0.015, -0.008, 0.025]),
+    'GLD': Vector([-0.005, 0.01, -0.002, 0.015, -0.01, 0.008, -0.003, -0.005, 0.012, -0.008]),
+    'TLT': Vector([-0.003, 0.012, -0.004, 0.01, -0.012, 0.01, -0.001, -0.006, 0.01, -0.01]),
+}
+
+def test_linkage_tree():
+    """Test single linkage on a small distance matrix"""
+    distances = [[0, 1, 4], [1, 0, 3], [4, 3, 0]]
+    linkage = linkage_tree(distances, method='single')
+    assert linkage == [(0, 1, 1, 2), (2, 3, 3, 3)]
+    assert quasi_diagonal_order(linkage, 3) == [2, 0, 1]
+    assert cut_tree(linkage, 3, n_clusters=2) == [1, 1, 0]
+    print("✓ Single linkage tree")
+
+def test_average_and_ward_linkage():
+    """Test that average and Ward linkage merge the closest pair first"""
+    distances = [[0, 1, 5, 6], [1, 0, 5, 6], [5, 5, 0, 2], [6, 6, 2, 0]]
+    for method in ('average', 'ward'):
+        linkage = linkage_tree(distances, method=method)
+        assert linkage[0][:3] == (0, 1, 1)
+        assert linkage[1][:2] == (2, 3)
+        assert linkage[-1][3] == 4
+    print("✓ Average / Ward linkage")
+
+def test_hierarchical_clusters():
+    """Test that equities and bonds/gold end up in separate clusters"""
+    analyzer = PortfolioAnalyzer(SAMPLE_RETURNS)
+    for method in ('single', 'average', 'ward'):
+        result = analyzer.hierarchical_clusters(method=method, n_clusters=2)
+        clusters = result['clusters']
+        assert clusters['SPY'] == clusters['QQQ']
+        assert clusters['GLD'] == clusters['TLT']
+        assert clusters['SPY'] != clusters['GLD']
+        assert sorted(result['order']) == sorted(SAMPLE_RETURNS)
+    print("✓ Hierarchical clusters")
+
+def test_profiler():
+    """Test that the profiler counts calls and restores the originals"""
+    original_dot = Vector.dot
+    analyzer = PortfolioAnalyzer(SAMPLE_RETURNS)
+    with Profiler() as prof:
+        analyzer.correlation_matrix()
+    stats = prof.snapshot()
+    # 4 assets → 12 off-diagonal correlations, each de-meaning 2 vectors
+    assert stats['Vector.correlation_with']['calls'] == 12
+    assert stats['Vector.de_mean']['calls'] == 24
+    assert stats['Vector.de_mean']['elements'] == 24 * 10
+    assert stats['PortfolioAnalyzer.correlation_matrix']['allocations'] == 24
+    assert Vector.dot is original_dot
+    print("✓ Profiler")
+
+def test_market_data_service():
+    """Test that streamed statistics match the batch analyzer"""
+    assets = list(SAMPLE_RETURNS)
+    bars = [{asset: SAMPLE_RETURNS[asset].components[t] for asset in assets}
+            for t in range(len(SAMPLE_RETURNS['SPY']))]
+    bars.insert(3, {'SPY': 0.01})  # Incomplete bar is dropped
+
+    async def scenario():
+        service = MarketDataService(assets, pairs_threshold=0.85)
+        await service.run(replay_feed(bars))
+        snapshots = await asyncio.gather(service.snapshot(), service.snapshot())
+        return service, snapshots
+
+    service, (snapshot, other) = asyncio.run(scenario())
+    assert snapshot is other
+    assert snapshot['observations'] == 10
+    assert service.dropped == 1
+
+    analyzer = PortfolioAnalyzer(SAMPLE_RETURNS)
+    expected = analyzer.portfolio_statistics()
+    for asset in assets:
+        for key, value in expected[asset].items():
+            assert abs(snapshot['statistics'][asset][key] - value) < 1e-10
+    expected_pairs = analyzer.find_pairs_trading_candidates(threshold=0.85)
+    assert [p[:2] for p in snapshot['top_pairs']] == [p[:2] for p in expected_pairs]
+    for (_, _, corr), (_, _, expected_corr) in zip(snapshot['top_pairs'], expected_pairs):
+        assert abs(corr - expected_corr) < 1e-10
+
+    # VaR / CVaR over a bounded rolling window (ring buffer of the last 4 bars)
+    windowed = IncrementalStats(assets, var_window=4)
+    for bar in bars[:3] + bars[4:]:
+        windowed.update([bar[asset] for asset in assets])
+    assert len(windowed.history[0]) == 4
+    last = Vector(SAMPLE_RETURNS['SPY'].components[-4:])
+    stats = windowed.statistics()['SPY']
+    assert stats['value_at_risk'] == asset_statistics(last)['value_at_risk']
+    assert stats['conditional_var'] == asset_statistics(last)['conditional_var']
+    assert stats['volatility'] == snapshot['statistics']['SPY']['volatility']
+    print("✓ Market data service")
+
+def test_correlation_cache():
+    """Test that cached matrices match and only changed rows are recomputed"""
+    with tempfile.TemporaryDirectory() as directory:
+        analyzer = PortfolioAnalyzer(SAMPLE_RETURNS)
+        expected = analyzer.correlation_matrix()['matrix']
+
+        first = analyzer.correlation_matrix(cache=CorrelationCache(directory))
+        assert first['matrix'] == expected
+        assert first['cache'] == {'reused_pairs': 0, 'computed_pairs': 6}
+
+        # New run (new cache object) with one asset changed
+        changed = dict(SAMPLE_RETURNS)
+        changed['TLT'] = Vector(SAMPLE_RETURNS['TLT'].components[:-1] + [0.02])
+        analyzer = PortfolioAnalyzer(changed)
+        second = analyzer.correlation_matrix(cache=CorrelationCache(directory))
+        assert second['cache'] == {'reused_pairs': 3, 'computed_pairs': 3}
+        assert second['matrix'] == analyzer.correlation_matrix()['matrix']
+
+        # Tiny size limit keeps only the newest matrix on disk
+        cache = CorrelationCache(directory, max_bytes=1)
+        third = analyzer.correlation_matrix(cache=cache)
+        assert third['cache']['computed_pairs'] == 0
+        assert len(cache.index) == 1
+
+        # Constant and huge-scale series: same values as the uncached path
+        universe = make_pairs_universe(300)
+        edge = {
+            'FLAT': Vector([0.7] * 300),
+            'CASH': Vector([0.0001] * 300),
+            'HUGE': Vector([x * 1e200 for x in universe['BASE'].components]),
+            'BIG': Vector([x * 1e200 for x in universe['TWIN'].components]),
+        }
+        analyzer = PortfolioAnalyzer(edge)
+        cached = analyzer.correlation_matrix(cache=CorrelationCache(directory))['matrix']
+        assert cached == analyzer.correlation_matrix()['matrix']
+        assert cached[0][1] == 0.0 and math.isfinite(cached[2][3])
+    print("✓ Correlation cache")
+
+def make_pairs_universe(n_obs=500, seed=0):
+    """Random-walk asset, a cointegrated twin and a correlated non-cointegrated twin"""
+    rng = random.Random(seed)
+    base, twin, drifter = [0.0], [0.0], [0.0]
+    deviation = 0.0
+    for _ in range(n_obs):
+        step = rng.gauss(0, 0.01)
+        deviation = 0.8 * deviation + rng.gauss(0, 0.002)  # Stationary AR(1)
+        base.append(base[-1] + step)
+        twin.append(base[-1] + deviation)
+        drifter.append(drifter[-1] + step + rng.gauss(0, 0.002))  # Spread is a random walk
+
+    def to_returns(log_prices):
+        return Vector([math.expm1(log_prices[t + 1] - log_prices[t]) for t in range(n_obs)])
+    return {'BASE': to_returns(base), 'TWIN': to_returns(twin), 'DRIFT': to_returns(drifter)}
+
+def test_cointegration_screen():
+    """Test that only the cointegrated twin passes the ADF screen"""
+    analyzer = PortfolioAnalyzer(make_pairs_universe())
+    results = analyzer.find_cointegrated_pairs(threshold=0.85)
+    verdicts = {frozenset((r['asset1'], r['asset2'])): r for r in results}
+
+    twin = verdicts[frozenset(('BASE', 'TWIN'))]
+    assert twin['is_cointegrated']
+    assert abs(twin['hedge_ratio'] - 1.0) < 0.1
+    assert 1 < twin['half_life'] < 10  # AR(1) with phi=0.8 → ~3 periods
+    drift = verdicts.get(frozenset(('BASE', 'DRIFT')))
+    assert drift is None or not drift['is_cointegrated']
+
+    # Process pool gives the same answer as the in-process path
+    candidates = analyzer.find_pairs_trading_candidates(threshold=0.85)
+    serial = screen_pairs(analyzer.returns, candidates)
+    parallel = screen_pairs(analyzer.returns, candidates, workers=2, batch_size=1)
+    assert serial == parallel
+
+    # A -100% return has no log price: clear error naming the asset and index
+    wiped = dict(make_pairs_universe(50), BUST=Vector([0.01] * 10 + [-1.0] + [0.0] * 39))
+    try:
+        PortfolioAnalyzer(wiped).find_cointegrated_pairs(threshold=-1)
+        assert False, "A -100% return should raise"
+    except ValueError as exc:
+        assert "'BUST'" in str(exc) and "index 10" in str(exc)
+    print("✓ Cointegration screen")
+
+def test_imports_have_no_side_effects():
+    """Test that library modules import silently and without heavy modules"""
+    for module in BUDGETS_MS:
+        output, heavy = check_import(module)
+        assert output == "", module
+        assert heavy == [], (module, heavy)
+    print("✓ Imports have no side effects")
+
+def test_batch_cli():
+    """Test the batch CLI end to end with a process pool"""
+    with tempfile.TemporaryDirectory() as directory:
+        returns_path = os.path.join(directory, 'returns.json')
+        with open(returns_path, 'w') as f:
+            json.dump({asset: v.components for asset, v in SAMPLE_RETURNS.items()}, f)
+        portfolios_path = os.path.join(directory, 'portfolios.json')
+        with open(portfolios_path, 'w') as f:
+            json.dump([{'name': 'equities', 'assets': ['SPY', 'QQQ']},
+                       {'name': 'mixed', 'assets': ['SPY', 'GLD', 'TLT']},
+                       {'name': 'broken', 'assets': ['SPY', 'XYZ']}], f)
+        output = os.path.join(directory, 'out')
+
+        status = batch_cli.main(['--portfolios', portfolios_path, '--returns', returns_path,
+                                 '--output', output, '--workers', '2', '--format', 'binary',
+                                 '--quiet'])
+        assert status == 1  # 'broken' has an unknown asset
+
+        with open(os.path.join(output, 'summary.json')) as f:
+            summary = json.load(f)
+        assert summary['portfolios'] == 3 and list(summary['errors']) == ['broken']
+
+        with open(os.path.join(output, 'equities.json')) as f:
+            result = json.load(f)
+        expected = PortfolioAnalyzer({a: SAMPLE_RETURNS[a] for a in ('SPY', 'QQQ')})
+        assert result['pairs_trading'] == [list(p) for p in expected.find_pairs_trading_candidates()]
+        assert os.path.getsize(os.path.join(output, 'mixed.corr.bin')) == 9 * 8
+
+        # One correlation matrix per portfolio, shared by both pair lists
+        with Profiler() as prof:
+            batch_cli.analyze_portfolio({a: v.components for a, v in SAMPLE_RETURNS.items()},
+                                        {'name': 'all', 'assets': list(SAMPLE_RETURNS)},
+                                        {'pairs_threshold': 0.85, 'div_threshold': 0.5, 'top': 3})
+        assert prof.snapshot()['PortfolioAnalyzer.correlation_matrix']['calls'] == 1
+
+        # Malformed entries are recorded, names cannot escape the output directory
+        summary = batch_cli.run_batch(
+            {a: v.components for a, v in SAMPLE_RETURNS.items()},
+            [{'name': '../escape', 'assets': ['SPY', 'QQQ']}, {'name': 'bad', 'assets': 5}, 'junk'],
+            output, {'pairs_threshold': 0.85, 'div_threshold': 0.5, 'top': 3})
+        assert sorted(summary['errors']) == ['#2', 'bad']
+        assert os.path.exists(os.path.join(output, '_escape.json'))
+        assert not os.path.exists(os.path.join(directory, 'escape.json'))
+        try:
+            batch_cli.run_batch({}, [{'name': 'a/b'}, {'name': 'a_b'}], output, {})
+            assert False, "Duplicate names should be rejected"
+        except ValueError:
+            pass
+        try:
+            batch_cli.run_batch({}, [{'name': 'summary', 'assets': ['SPY']}], output, {})
+            assert False, "'summary' would be overwritten by summary.json"
+        except ValueError as exc:
+            assert 'Reserved' in str(exc)
+    print("✓ Batch CLI")
+
+def test_correlation_graph():
+    """Test that the sparse graph matches the dense matrix above threshold"""
+    analyzer = PortfolioAnalyzer(SAMPLE_RETURNS)
+    matrix = analyzer.correlation_matrix()['matrix']
+    assets = analyzer.assets
+    graph = analyzer.correlation_graph(threshold=0.8, block_size=3)
+
+    expected = {(assets[i], assets[j]) for i in range(len(assets))
+                for j in range(i + 1, len(assets)) if abs(matrix[i][j]) >= 0.8}
+    assert {(a, b) for a, b, _ in graph.edges()} == expected
+    for a, b, corr in graph.edges():
+        assert abs(corr - matrix[assets.index(a)][assets.index(b)]) < 1e-12
+
+    peers = graph.neighbors('SPY')
+    assert peers[0][0] == 'QQQ'
+    assert [abs(c) for _, c in peers] == sorted((abs(c) for _, c in peers), reverse=True)
+    expected_pairs = analyzer.find_pairs_trading_candidates(threshold=0.85)
+    assert [p[:2] for p in graph.pairs_above(0.85)] == [p[:2] for p in expected_pairs]
+    assert len(PortfolioAnalyzer(SAMPLE_RETURNS).correlation_graph(0.99).connected_components()) == 3
+
+    # Constant and huge-scale series: same edges as the dense matrix
+    universe = make_pairs_universe(300)
+    analyzer = PortfolioAnalyzer({
+        'FLAT': Vector([0.7] * 300),
+        'CASH': Vector([0.1] * 300),
+        'HUGE': Vector([x * 1e200 for x in universe['BASE'].components]),
+        'BIG': Vector([x * 1e200 for x in universe['TWIN'].components]),
+    })
+    matrix = analyzer.correlation_matrix()['matrix']
+    edges = list(analyzer.correlation_graph(threshold=0.5).edges())
+    assert [(a, b) for a, b, _ in edges] == [('HUGE', 'BIG')]
+    assert abs(edges[0][2] - matrix[2][3]) < 1e-12
+    print("✓ Sparse correlation graph")
+
+def is_positive_definite(matrix):
+    """Cholesky decomposition succeeds only for positive definite matrices"""
+    n = len(matrix)
+    lower = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1):
+            value = matrix[i][j] - sum(lower[i][k] * lower[j][k] for k in range(j))
+            if i == j:
+                if value <= 1e-12:
+                    return False
+                lower[i][i] = math.sqrt(value)
+            else:
+                lower[i][j] = value / lower[j][j]
+    return True
+
+def test_shrinkage_estimators():
+    """Test shrinkage on a window shorter than the number of assets"""
+    rng = random.Random(3)
+    market = [rng.gauss(0, 0.01) for _ in range(4)]
+    returns = {f"A{k}": Vector([m + rng.gauss(0, 0.01) for m in market]) for k in range(6)}
+    analyzer = PortfolioAnalyzer(returns)
+
+    sample = analyzer.shrunk_correlation_matrix(method='sample')
+    expected = analyzer.correlation_matrix()['matrix']
+    for row, expected_row in zip(sample['matrix'], expected):
+        for value, expected_value in zip(row, expected_row):
+            assert abs(value - expected_value) < 1e-10
+    assert sample['shrinkage'] == 0.0
+    assert not is_positive_definite(sample['matrix'])  # 4 days, 6 assets → singular
+
+    for method in ('ledoit_wolf', 'constant_correlation'):
+        shrunk = analyzer.shrunk_correlation_matrix(method=method)
+        assert 0 < shrunk['shrinkage'] <= 1
+        assert is_positive_definite(shrunk['matrix'])
+    print("✓ Shrinkage estimators")
+
+def test_factor_decomposition():
+    """Test that the top factor matches the exact covariance eigenvector"""
+    from pca import jacobi_eigen
+
+    rng = random.Random(11)
+    market = [rng.gauss(0, 0.01) for _ in range(60)]
+    returns = {f"A{k}": Vector([(0.5 + 0.1 * k) * m + rng.gauss(0, 0.003) for m in market])
+               for k in range(8)}
+    result = PortfolioAnalyzer(returns).factor_decomposition(n_factors=2)
+
+    rows = [v.de_mean().components for v in returns.values()]
+    covariance = [[sum(a * b for a, b in zip(r1, r2)) / 60 for r2 in rows] for r1 in rows]
+    eigenvalues, eigenvectors = jacobi_eigen(covariance)
+    top = eigenvectors[0] if sum(eigenvectors[0]) > 0 else [-x for x in eigenvectors[0]]
+
+    assert abs(result['explained_variance'][0] - eigenvalues[0]) < 1e-12
+    assert result['explained_variance_ratio'][0] > 0.9  # One-factor universe
+    for k, asset in enumerate(returns):
+        assert abs(result['loadings'][asset][0] - top[k]) < 1e-8
+        # Residuals keep the mean but carry no market exposure
+        residual = result['residuals'][asset]
+        assert abs(residual.mean() - returns[asset].mean()) < 1e-12
+        assert abs(residual.correlation_with(result['factor_returns'][0])) < 1e-6
+    print("✓ Factor decomposition")
+
+def test_pairs_backtest():
+    """Test the walk-forward pairs backtest on a known mean-reverting spread"""
+    spread = [0.0, 3.0, 2.0, 0.2, -3.0, -1.0]
+    pnl, trades, turnover = trade_spread(spread, 1.0, entry_z=2.0, exit_z=0.5)
+    assert pnl == [0, 1.0, 1.8, 0, 2.0]  # short at +3, flat at 0.2, long at -3
+    assert (trades, turnover) == (2, 4)  # Open position closed at the end
+
+    assert walk_forward_windows(10, 4, 3) == [(0, 4, 7), (3, 7, 10)]
+    analyzer = PortfolioAnalyzer(make_pairs_universe(n_obs=600))
+    result = analyzer.backtest_pairs_trading(train_size=120, test_size=40, threshold=0.8,
+                                             significance='10%')
+    assert len(result['returns']) == 12 * 40
+    traded = [(p['asset1'], p['asset2']) for w in result['windows'] for p in w['pairs']]
+    assert traded.count(('BASE', 'TWIN')) == 12  # Cointegrated in every window
+    assert len(traded) - 12 <= 3  # Random-walk spreads pass only by chance
+    assert result['total_pnl'] > 0 and result['sharpe'] > 0
+
+    serial = walk_forward_backtest(analyzer.returns, 120, 40, threshold=0.8)
+    parallel = walk_forward_backtest(analyzer.returns, 120, 40, threshold=0.8, workers=2)
+    assert serial['returns'].components == parallel['returns'].components
+    print("✓ Walk-forward pairs backtest")
+
+def shared_mean(name, asset):
+    """Attach from another process and read one asset (pool worker)"""
+    with SharedReturns(name) as shared:
+        return shared.version, shared.vector(asset).mean()
+
+def test_shared_returns():
+    """Test zero-copy shared-memory returns, versioned swaps and other processes"""
+    from concurrent.futures import ProcessPoolExecutor
+    name = f"test-returns-{os.getpid()}"
+    with SharedReturnsPublisher(name) as publisher:
+        assert publisher.publish(SAMPLE_RETURNS) == 1
+        analyzer = PortfolioAnalyzer.from_shared(name)
+        expected = PortfolioAnalyzer(SAMPLE_RETURNS).correlation_matrix()
+        assert analyzer.assets == list(SAMPLE_RETURNS)
+        assert analyzer.correlation_matrix() == expected
+
+        spy = analyzer.returns['SPY']
+        try:
+            spy.components[0] = 1.0
+            assert False, "shared views must be read-only"
+        except TypeError:
+            pass
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            assert pool.submit(shared_mean, name, 'SPY').result() == (1, spy.mean())
+
+        # Update: readers switch on refresh(), old Vectors keep their version
+        updated = dict(SAMPLE_RETURNS, SPY=Vector([0.1] * len(spy)))
+        assert publisher.publish(updated) == 2
+        assert analyzer.refresh_shared() and not analyzer.refresh_shared()
+        assert abs(analyzer.returns['SPY'].mean() - 0.1) < 1e-12
+        assert spy.mean() == SAMPLE_RETURNS['SPY'].mean()
+        analyzer.shared.close()
+    print("✓ Shared-memory return matrix")
+
+def test_risk_statistics():
+    """Test the fused statistics kernel against direct definitions"""
+    assert sorted(smallest([5, 1, 4, 1, 3, 9, 2], 4)) == [1, 1, 2, 3]
+    assert max_drawdown([0.1, -0.5, 0.2]) == 0.5 and max_drawdown([0.1, 0.2]) == 0.0
+    assert max_drawdown([0.2, -1.5, 0.3]) == 1.0  # Wiped out, not more
+
+    rng = random.Random(5)
+    returns = {f"A{k}": Vector([rng.gauss(0.0005, 0.01) ** 3 * 1e4 for _ in range(400)])
+               for k in range(3)}
+    stats = PortfolioAnalyzer(returns).portfolio_statistics(confidence=0.95)
+    for asset, r in returns.items():
+        s = stats[asset]
+        x = r.components
+        assert s['mean_return'] == r.mean() and s['volatility'] == r.std()
+        assert (s['max_return'], s['min_return']) == (max(x), min(x))
+        worst = sorted(x)[:20]  # 5% of 400
+        assert s['value_at_risk'] == -worst[-1]
+        assert abs(s['conditional_var'] + sum(worst) / 20) < 1e-15
+        m = r.mean()
+        m2 = sum((v - m) ** 2 for v in x) / len(x)
+        assert abs(s['skewness'] - sum((v - m) ** 3 for v in x) / len(x) / m2 ** 1.5) < 1e-9
+        assert abs(s['excess_kurtosis'] - (sum((v - m) ** 4 for v in x) / len(x) / m2 ** 2 - 3)) < 1e-9
+        wealth = peak = 1.0
+        drawdown = 0.0
+        for v in x:
+            wealth *= 1 + v
+            peak = max(peak, wealth)
+            drawdown = max(drawdown, 1 - wealth / peak)
+        assert abs(s['max_drawdown'] - drawdown) < 1e-12
+    print("✓ Risk statistics")
+
+def test_regime_search():
+    """Test rolling regime features, the k-d tree and the saved index"""
+    rng = random.Random(11)
+    returns, volume, bonds = [], [], []
+    for t in range(1500):
+        sigma = 0.03 if 600 <= t < 700 or 1400 <= t else 0.008  # Two crises
+        returns.append(rng.gauss(0, sigma))
+        volume.append(1e6 * (1 + 40 * abs(returns[-1])))
+        bonds.append(-0.4 * returns[-1] + rng.gauss(0, 0.005))
+    market = Vector(returns)
+
+    features = rolling_features(market, 20, Vector(volume), others={'TLT': Vector(bonds)})
+    assert features['names'] == ['volatility', 'trend_strength', 'volume_ratio', 'corr_TLT']
+    assert features['ends'][0] == 99  # First end with a full volume lookback
+    end = 800
+    window = Vector(returns[end - 19:end + 1])
+    row = features['rows'][features['ends'].index(end)]
+    assert abs(row[0] - window.std()) < 1e-12
+    assert abs(row[3] - window.correlation_with(Vector(bonds[end - 19:end + 1]))) < 1e-9
+
+    index = RegimeIndex.build(market, 20, Vector(volume), others={'TLT': Vector(bonds)})
+    points = {e: index.scaler.transform(r) for e, r in index.rows.items()}
+    query = points[index.latest]
+    brute = sorted((math.dist(query, p), e) for e, p in points.items() if e < index.latest - 19)
+    nearest = index.similar(k=5, distinct=False)
+    assert [e for e, _ in nearest] == [e for _, e in brute[:5]]
+    assert all(abs(d - b[0]) < 1e-12 for (_, d), b in zip(nearest, brute))
+
+    # Today is a crisis: the closest distinct episode is the first crisis
+    episodes = index.similar(k=3)
+    assert 600 <= episodes[0][0] < 720
+    assert all(abs(a[0] - b[0]) >= 20 for a in episodes for b in episodes if a is not b)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'regimes.idx')
+        index.save(path)
+        loaded = RegimeIndex.load(path)
+    assert loaded.names == index.names and loaded.rows == index.rows
+    assert loaded.similar(k=3) == episodes
+    print("✓ Regime similarity search")
+
+def test_correlation_stability():
+    """Test block correlations, Fisher-z stability tests and break flags"""
+    assert abs(chi2_sf(3.841458820694124, 1) - 0.05) < 1e-12
+    assert abs(chi2_sf(7.814727903251179, 3) - 0.05) < 1e-12
+
+    rng = random.Random(2)
+    market = [rng.gauss(0, 0.01) for _ in range(400)]
+    stable = [0.9 * x + 0.0044 * rng.gauss(0, 1) for x in market]
+    # Same correlation as STABLE for 300 days, then decouples
+    breaking = [0.9 * x + 0.0044 * rng.gauss(0, 1) if t < 300 else 0.01 * rng.gauss(0, 1)
+                for t, x in enumerate(market)]
+    analyzer = PortfolioAnalyzer({'MKT': Vector(market), 'STABLE': Vector(stable),
+                                  'BREAK': Vector(breaking)})
+
+    stability = analyzer.correlation_stability(n_blocks=4)
+    assert stability.bounds == [(0, 100), (100, 200), (200, 300), (300, 400)]
+    ok = stability.stats('MKT', 'STABLE')
+    expected = Vector(market[100:200]).correlation_with(Vector(stable[100:200]))
+    assert abs(ok['block_correlations'][1] - expected) < 1e-12
+    assert ok['stable'] and not ok['broken'] and ok['p_value'] > 0.05
+    broken = stability.stats('BREAK', 'MKT')
+    assert broken['broken'] and not broken['stable'] and broken['break_z'] < -5
+    assert broken['dispersion'] > 5 * ok['dispersion']
+    assert stability.unstable_pairs() == [('MKT', 'BREAK'), ('STABLE', 'BREAK')]
+
+    # Full-sample correlation still looks fine; the stable screen drops it
+    candidates = analyzer.find_pairs_trading_candidates(threshold=0.7)
+    assert {p[:2] for p in candidates} >= {('MKT', 'STABLE'), ('MKT', 'BREAK')}
+    stable_pairs = analyzer.find_stable_pairs_trading_candidates(threshold=0.7)
+    assert [p[:2] for p in stable_pairs] == [('MKT', 'STABLE')]
+
+    # Two unrelated assets, both flat (e.g. halted) in the last block: zero
+    # variance there, not a spurious ±1 correlation from rounding noise
+    halted1 = [0.01 * rng.gauss(0, 1) for _ in range(300)] + [0.0007] * 100
+    halted2 = [0.01 * rng.gauss(0, 1) for _ in range(300)] + [0.0003] * 100
+    flat = PortfolioAnalyzer({'H1': Vector(halted1), 'H2': Vector(halted2)}).correlation_stability(4)
+    halted = flat.stats('H1', 'H2')
+    assert halted['block_correlations'][3] == 0.0
+    assert halted['stable'] and not halted['broken']
+    print("✓ Correlation stability")
+
+
+def run_all_tests():
+    """Run all tests"""
+    print("\n" + "="*50)
+    print("RUNNING PORTFOLIO ANALYZER TESTS")
+    print("="*50 + "\n")
+
+    test_linkage_tree()
+    test_average_and_ward_linkage()
+    test_hierarchical_clusters()
+    test_profiler()
+    test_market_data_service()
+    test_correlation_cache()
+    test_cointegration_screen()
+    test_imports_have_no_side_effects()
+    test_batch_cli()
+    test_correlation_graph()
+    test_shrinkage_estimators()
+    test_factor_decomposition()
+    test_pairs_backtest()
+    test_shared_returns()
+    test_risk_statistics()
+    test_regime_search()
+    test_correlation_stability()
+
+    print("\n" + "="*50)
+    print("ALL IMPLEMENTED TESTS PASSED ✓")
+    print("="*50 + "\n")
+
+if __name__ == "__main__":
+    run_all_tests()
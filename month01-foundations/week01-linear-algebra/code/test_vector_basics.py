@@ -3,7 +3,8 @@ Test suite for Vector class - Days 1-3
 Run with: python test_vector_basics.py
 """
 
-from vector_basics import Vector
+from vector_basics import Vector, batch_norms
+from summation import blocked_sum, compensated_dot
 import math
 
 def test_basic_creation():
@@ -160,6 +161,87 @@ def test_correlation():
     assert abs(v7.correlation_with(v8) - v8.correlation_with(v7)) < 1e-10
     print("✓ Correlation symmetry")
 
+# PERFORMANCE EXTENSIONS
+
+def test_lazy_vector():
+    """Test that fused lazy expressions match eager Vector results"""
+    a = Vector([1.5, -2.0, 3.25, 0.5, 4.0])
+    b = Vector([2.0, 1.0, -1.5, 3.0, 0.25])
+    la, lb = a.lazy(), b.lazy()
+    for lazy_z, eager_z in zip(la.standardize().to_vector().components, a.standardize().components):
+        assert abs(lazy_z - eager_z) < 1e-12
+    assert abs(la.std() - a.std()) < 1e-12
+    assert abs(la.distance(lb) - a.distance(b)) < 1e-12
+    assert abs(la.correlation_with(lb) - a.correlation_with(b)) < 1e-12
+    assert abs((la - lb).scalar_multiply(2).norm(1) - (a - b).scalar_multiply(2).norm(1)) < 1e-12
+    assert la.add(lb).dot(la) == a.add(b).dot(a)
+    assert Vector([3, 3, 3, 3, 3]).lazy().correlation_with(b.lazy()) == 0.0  # Zero variance
+    print("✓ Lazy vector expressions")
+
+
+def test_multi_norms():
+    """Test combined norms, batching and overflow-safe L2"""
+    v = Vector([3, -4, 12])
+    norms = v.norms(ps=(1, 2, 3, float('inf')))
+    for p, value in norms.items():
+        assert abs(value - v.norm(p)) < 1e-10
+    assert norms[2] == 13.0
+    assert batch_norms([v, Vector([1, 1])], ps=(1,)) == [{1: 19}, {1: 2}]
+    # Naive sum of squares overflows to inf / underflows to 0 here
+    assert abs(Vector([3e200, 4e200]).norm() - 5e200) < 1e188
+    assert abs(Vector([3e-200, 4e-200]).norm() - 5e-200) < 1e-212
+    print("✓ Multiple norms in one call")
+
+
+def test_compensated_summation():
+    """Test that long sums do not drift and integers stay exact"""
+    values = [0.1] * 100_000
+    exact = math.fsum(values)
+    assert abs(blocked_sum(values) - exact) < abs(sum(values) - exact)
+    assert abs(Vector(values).mean() - 0.1) < 1e-15
+    assert abs(compensated_dot(values, [1.0] * 100_000) - exact) < 1e-9
+    assert Vector([1, 2, 3]).dot(Vector([4, 5, 6])) == 32
+    assert blocked_sum(list(range(1000)), block_size=7) == 499500
+    # Integer vectors stay exact ints past one block, eager and lazy
+    ints = Vector(list(range(1000)))
+    assert ints.dot(ints) == 332833500 and type(ints.dot(ints)) is int
+    assert ints.lazy().dot(ints) == 332833500 and ints.lazy().mean() == ints.mean()
+    assert blocked_sum(iter(values), block_size=1000) == blocked_sum(values, block_size=1000)
+    assert abs(Vector(values).lazy().mean() - 0.1) < 1e-15
+
+    # Finite partials whose total overflows: inf like sum(), not OverflowError
+    huge = Vector([5e305] * 512)
+    assert huge.mean() == math.inf and huge.lazy().mean() == math.inf
+    assert huge.dot(Vector([1e3] * 512)) == math.inf
+    for scale in (1e152, 1e153, 1e154):
+        a = Vector([scale * math.sin(k) for k in range(2000)])
+        b = Vector([scale * (math.sin(k) + math.cos(3 * k)) for k in range(2000)])
+        expected = Vector([math.sin(k) for k in range(2000)]).correlation_with(
+            Vector([math.sin(k) + math.cos(3 * k) for k in range(2000)]))
+        assert abs(a.correlation_with(b) - expected) < 1e-12
+        assert abs(a.lazy().correlation_with(b.lazy()) - expected) < 1e-12
+    print("✓ Compensated summation")
+
+
+def test_backend_equivalence():
+    """Test that list, array, memoryview and lazy Vectors agree with the reference"""
+    from backend_harness import BACKENDS, agree, ref_mean, run
+    report = run(n_cases=20, seed=1)
+    assert report['mismatches'] == []
+    # Overflow is a value (inf) in the reference, never an agreeing exception
+    assert ref_mean([5e305] * 512) == math.inf
+    assert not agree(OverflowError(), OverflowError())
+    assert abs(Vector([1e153] * 8).norm(3) - 2e153) < 1e140
+    assert report['checked'] > 0
+    assert set(report['timings']) == {'reference'} | set(BACKENDS)
+    # Constant series: exactly zero variance despite rounding in the mean
+    assert Vector([0.7] * 300).correlation_with(Vector([0.01 * k for k in range(300)])) == 0.0
+    try:
+        Vector([1, 2, 3]).lazy().dot(Vector([1, 2]))
+        assert False, "Length mismatch should raise"
+    except ValueError:
+        pass
+    print("✓ Backend equivalence")
 
 
 def run_all_tests():
@@ -200,6 +282,13 @@ def run_all_tests():
     except AttributeError as e:
         print(f"⚠ Some Day 4 methods not yet implemented: {e}")
 
+
+    # Performance extensions
+    print("\n--- Performance Extensions ---")
+    test_lazy_vector()
+    test_multi_norms()
+    test_compensated_summation()
+    test_backend_equivalence()
     
     print("\n" + "="*50)
     print("ALL IMPLEMENTED TESTS PASSED ✓")
@@ -3,6 +3,78 @@ Vector class implementation - Day 1
 Building linear algebra from scratch to understand ML foundations
 """
 import math
+import sys
+from itertools import repeat
+
+from summation import blocked_sum, compensated_dot
+
+
+def _l1_norm(absolute):
+    """L1 norm (Manhattan): sum of absolute values"""
+    return blocked_sum(absolute)
+
+
+def _l2_norm(absolute):
+    """L2 norm (Euclidean) - math.hypot scales internally, so no overflow/underflow"""
+    return math.hypot(*absolute)
+
+
+def _max_norm(absolute):
+    """L-infinity norm: maximum absolute value"""
+    return max(absolute)
+
+
+def _lp_norm(absolute, p):
+    """General Lp norm: (sum of |x|^p)^(1/p)"""
+    try:
+        return blocked_sum(list(map(pow, absolute, repeat(p)))) ** (1 / p)
+    except OverflowError:
+        # |x|^p overflows (e.g. 1e153 cubed): scale by the largest entry first
+        scale = max(absolute)
+        return scale * blocked_sum([(x / scale) ** p for x in absolute]) ** (1 / p)
+
+
+# p → norm of the absolute values, looked up once per norm instead of an
+# if/elif chain; any other p uses _lp_norm
+_NORMS = {1: _l1_norm, 2: _l2_norm, float('inf'): _max_norm}
+
+
+def _norm_of(absolute, p):
+    """p-norm from precomputed absolute values (the one dispatch path)"""
+    norm_function = _NORMS.get(p)
+    if norm_function is not None:
+        return norm_function(absolute)
+    return _lp_norm(absolute, p)
+
+
+def _check_same_length(a, b):
+    """Element-wise operations need vectors of the same dimension"""
+    if len(a) != len(b):
+        raise ValueError(f"Vector dimensions differ: {len(a)} != {len(b)}")
+
+
+def _is_constant(components):
+    """Zero variance, tested exactly (rounding in the mean leaves ~1e-17 deviations)"""
+    return min(components) == max(components)
+
+
+def batch_norms(vectors, ps=(1, 2, float('inf'))):
+    """
+    Several p-norms for many vectors at once.
+
+    Args:
+        vectors: List of Vector objects
+        ps: Norm orders to compute
+
+    Returns:
+        List of {p: norm} dictionaries, one per vector
+
+    Example:
+        batch_norms([Vector([3, 4]), Vector([1, 1])], ps=(1, 2))
+        # [{1: 7, 2: 5.0}, {1: 2, 2: 1.414...}]
+    """
+    return [v.norms(ps) for v in vectors]
+
 
 class Vector:
     """A simple vector class for learning linear algebra"""
@@ -12,7 +84,8 @@ class Vector:
         Initialize vector with a list of numbers
         
         Args:
-            components: list of numbers (int or float)
+            components: list of numbers (int or float), or any sequence of
+                        them, e.g. a read-only memoryview of shared memory
         
         Example:
             v = Vector([1, 2, 3])
@@ -54,7 +127,7 @@ class Vector:
             v2 = Vector([3, 4])
             v3 = v1.add(v2)  # Should be Vector([4, 6])
         """
-        
+        _check_same_length(self, other)
         elements = [self.components[i] + other.components[i] for i in range(len(other))]
         return Vector(elements)
     
@@ -92,10 +165,9 @@ class Vector:
             v1.dot(v2)  # Should return 1*4 + 2*5 + 3*6 = 32
         """
         
-        dotProduct = 0
-        for i in range(len(other.components)):
-            dotProduct += self.components[i]*other.components[i]
-        return dotProduct
+        _check_same_length(self, other)
+        # Compensated (blocked) summation - accurate on very long series
+        return compensated_dot(self.components, other.components)
     
     def norm(self, p=2):
         """
@@ -116,21 +188,27 @@ class Vector:
             v.norm(1)     # 7.0 (Manhattan: |3| + |4|)
             v.norm(float('inf'))  # 4.0 (Max: max(|3|, |4|))
         """
-        if p == float('inf'):
-            # L-infinity norm: maximum absolute value
-            return max(abs(x) for x in self.components)
-        elif p == 1:
-            # L1 norm (Manhattan): sum of absolute values
-            return sum(abs(x) for x in self.components)
-        elif p == 2:
-            # L2 norm (Euclidean): sqrt of sum of squares
-            normVal = 0
-            for i in range(len(self.components)):
-                normVal += self.components[i]**2
-            return math.sqrt(normVal)
-        else:
-            # General Lp norm: (sum of |x|^p)^(1/p)
-            return sum(abs(x)**p for x in self.components) ** (1/p)
+        return _norm_of(list(map(abs, self.components)), p)
+
+    def norms(self, ps=(1, 2, float('inf'))):
+        """
+        Several p-norms of the same vector in one call.
+
+        The absolute values are computed once and shared by every norm.
+        L2 is overflow/underflow safe (e.g. 1e200 or 1e-200 entries).
+
+        Args:
+            ps: Norm orders to compute (default: L1, L2 and L-infinity)
+
+        Returns:
+            Dictionary {p: norm}
+
+        Example:
+            v = Vector([3, -4])
+            v.norms()  # {1: 7, 2: 5.0, inf: 4}
+        """
+        absolute = list(map(abs, self.components))
+        return {p: _norm_of(absolute, p) for p in ps}
      
     def angle_with(self, other):
         """
@@ -191,7 +269,6 @@ class Vector:
             v1.projection_onto(v2)  # Should return Vector([3, 0])
         """
         dotVal = self.dot(other=other)
-        normValOther = other.norm()
         return other.scalar_multiply(dotVal / other.dot(other))
         
 
@@ -235,11 +312,13 @@ class Vector:
             v2 = Vector([4, 6, 8])
             v1.distance(v2)  # Should return ~7.07
         """
-        return (self - other).norm()
+        _check_same_length(self, other)
+        # Same as (self - other).norm(), without building the difference Vector
+        return math.hypot(*[a - b for a, b in zip(self.components, other.components)])
     
     def mean(self):
-        """Average of elements"""
-        return sum(self.components) / len(self.components)
+        """Average of elements (compensated sum, see summation.py)"""
+        return blocked_sum(self.components) / len(self.components)
     
     def de_mean(self):
         """
@@ -263,7 +342,10 @@ class Vector:
     
         Trading: This IS volatility for returns
         """
-        return self.de_mean().rms()
+        # Same as self.de_mean().rms(), without building the de-meaned Vector
+        mean_val = self.mean()
+        deviations = [x - mean_val for x in self.components]
+        return math.hypot(*deviations) / math.sqrt(len(deviations))
     
     def standardize(self):
         """
@@ -302,21 +384,44 @@ class Vector:
             >>> returns_spy.correlation_with(returns_qqq)
             0.9987  # Highly correlated!
         """
+        _check_same_length(self, other)
+        # Handle edge case: if either vector has zero variance (std = 0)
+        if _is_constant(self.components) or _is_constant(other.components):
+            return 0.0  # Undefined correlation, return 0
+
         # De-mean both vectors (center them at zero)
         a_demean = self.de_mean()
         b_demean = other.de_mean()
 
+        # Calculate norms of de-meaned vectors
+        norm_a = a_demean.norm()
+        norm_b = b_demean.norm()
+
+        # Huge (~1e153) or tiny (~1e-200) returns overflow / underflow the
+        # products: use unit vectors instead (correlation is scale-free).
+        # |dot| <= norm_a * norm_b, so a finite denominator means the dot
+        # product below cannot overflow either.
+        denominator = norm_a * norm_b
+        if not sys.float_info.min < denominator < math.inf:
+            return a_demean.scalar_multiply(1 / norm_a).dot(b_demean.scalar_multiply(1 / norm_b))
+
         # Calculate dot product of de-meaned vectors
         numerator = a_demean.dot(b_demean)
+        return numerator / denominator
 
-        # Calculate norms of de-meaned vectors
-        denominator = a_demean.norm() * b_demean.norm()
+    def lazy(self):
+        """
+        Opt-in lazy mode: chained operations build an expression tree.
 
-        # Handle edge case: if either vector has zero variance (std = 0)
-        if denominator == 0:
-            return 0.0  # Undefined correlation, return 0
+        Element-wise chains and the reduction after them run as one fused
+        pass, without intermediate Vectors (see lazy_vector.py).
 
-        return numerator / denominator
+        Example:
+            v = Vector([2, 4, 6, 8])
+            v.lazy().standardize().to_vector()  # Same as v.standardize()
+        """
+        from lazy_vector import LazyVector
+        return LazyVector(self)
         
 
 
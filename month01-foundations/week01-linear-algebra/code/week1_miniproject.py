@@ -4,6 +4,9 @@ Demonstrates mastery of vector operations for systematic trading
 
 Author: Eyal Perelmuter
 Date: 2025-11-27
+
+Feature modules (clustering, screening, shrinkage, ...) are imported inside
+the methods that use them, so importing this module only loads Vector.
 """
 
 from vector_basics import Vector
@@ -35,14 +38,57 @@ class PortfolioAnalyzer:
         self.returns = returns_dict
         self.assets = list(returns_dict.keys())
         self.n_assets = len(self.assets)
+        self.shared = None
+    
+    @classmethod
+    def from_shared(cls, name):
+        """
+        Analyzer over a shared-memory return matrix (no copy of the data)
+        
+        Args:
+            name: Segment name used by the SharedReturnsPublisher
+        
+        Example:
+            analyzer = PortfolioAnalyzer.from_shared('universe')
+            analyzer.refresh_shared()   # pick up a newly published version
+        """
+        from shared_returns import SharedReturns
+        
+        shared = SharedReturns(name)
+        analyzer = cls(shared.returns_dict())
+        analyzer.shared = shared
+        return analyzer
+    
+    def refresh_shared(self):
+        """
+        Switch to the latest published version of the shared return matrix
+        
+        Returns:
+            True if the returns changed
+        """
+        if self.shared is None:
+            raise ValueError("Analyzer was not created with from_shared()")
+        if not self.shared.refresh():
+            return False
+        self.returns = self.shared.returns_dict()
+        self.assets = list(self.returns.keys())
+        self.n_assets = len(self.assets)
+        return True
         
-    def correlation_matrix(self):
+    def correlation_matrix(self, cache=None):
         """
         Calculate correlation matrix for all assets
         
+        Args:
+            cache: Optional CorrelationCache - reuse pairs of unchanged
+                   assets from previous runs
+        
         Returns:
             Dictionary with correlation data and matrix
         """
+        if cache is not None:
+            return cache.correlation_matrix(self)
+        
         n = self.n_assets
         matrix = []
         
@@ -65,6 +111,51 @@ class PortfolioAnalyzer:
             'assets': self.assets
         }
     
+    def correlation_graph(self, threshold=0.5, block_size=256):
+        """
+        Sparse correlation graph: only pairs with |correlation| >= threshold
+        
+        Use instead of correlation_matrix() for large universes - the dense
+        matrix is never built.
+        
+        Args:
+            threshold: Minimum |correlation| for an edge (default 0.5)
+            block_size: Assets per block while building the graph
+        
+        Returns:
+            CorrelationGraph (neighbour and connected-component queries)
+        """
+        from sparse_correlation import CorrelationGraph
+        
+        return CorrelationGraph.from_returns(self.returns, threshold=threshold,
+                                             block_size=block_size)
+    
+    def shrunk_correlation_matrix(self, method='ledoit_wolf'):
+        """
+        Correlation matrix from a shrinkage covariance estimator
+        
+        Short windows make the sample matrix noisy and singular (fewer days
+        than assets); shrinkage keeps it well conditioned.
+        
+        Args:
+            method: 'ledoit_wolf', 'constant_correlation' or 'sample'
+        
+        Returns:
+            Dictionary with correlation matrix, covariance and shrinkage intensity
+        """
+        from shrinkage import shrunk_covariance, covariance_to_correlation
+        
+        covariance, intensity = shrunk_covariance(
+            [self.returns[asset] for asset in self.assets], method=method)
+        
+        return {
+            'matrix': covariance_to_correlation(covariance),
+            'covariance': covariance,
+            'shrinkage': intensity,
+            'method': method,
+            'assets': self.assets
+        }
+    
     def print_correlation_matrix(self):
         """Pretty print correlation matrix"""
         corr_data = self.correlation_matrix()
@@ -86,18 +177,20 @@ class PortfolioAnalyzer:
         
         print("="*60)
     
-    def find_best_diversification_pairs(self, threshold=0.5):
+    def find_best_diversification_pairs(self, threshold=0.5, corr_data=None):
         """
         Find asset pairs with correlation below threshold
         Good for diversification
         
         Args:
             threshold: Maximum correlation for "diversified" (default 0.5)
+            corr_data: Result of correlation_matrix(), if already computed
         
         Returns:
             List of (asset1, asset2, correlation) tuples
         """
-        corr_data = self.correlation_matrix()
+        if corr_data is None:
+            corr_data = self.correlation_matrix()
         matrix = corr_data['matrix']
         assets = corr_data['assets']
         
@@ -114,17 +207,19 @@ class PortfolioAnalyzer:
         
         return diversified_pairs
     
-    def find_pairs_trading_candidates(self, threshold=0.85):
+    def find_pairs_trading_candidates(self, threshold=0.85, corr_data=None):
         """
         Find highly correlated pairs for pairs trading
         
         Args:
             threshold: Minimum correlation for pairs trading (default 0.85)
+            corr_data: Result of correlation_matrix(), if already computed
         
         Returns:
             List of (asset1, asset2, correlation) tuples
         """
-        corr_data = self.correlation_matrix()
+        if corr_data is None:
+            corr_data = self.correlation_matrix()
         matrix = corr_data['matrix']
         assets = corr_data['assets']
         
@@ -141,30 +236,164 @@ class PortfolioAnalyzer:
         
         return pairs
     
-    def portfolio_statistics(self):
-        """Calculate statistics for each asset"""
-        stats = {}
-        
-        for asset, returns in self.returns.items():
-            stats[asset] = {
-                'mean_return': returns.mean(),
-                'volatility': returns.std(),
-                'sharpe_approx': returns.mean() / returns.std() if returns.std() > 0 else 0,
-                'max_return': max(returns.components),
-                'min_return': min(returns.components)
-            }
+    def correlation_stability(self, n_blocks=4, significance=0.05):
+        """
+        Correlation of every pair in consecutive time blocks, with tests
+        for pairs whose correlation changed
+        
+        Args:
+            n_blocks: Number of consecutive blocks (at least 4 periods each)
+            significance: Test level for the stability / break flags
+        
+        Returns:
+            CorrelationStability (stats(asset1, asset2), unstable_pairs(),
+            filter_pairs(pairs))
+        """
+        from correlation_stability import CorrelationStability
+        
+        return CorrelationStability.from_returns(self.returns, n_blocks=n_blocks,
+                                                 significance=significance)
+    
+    def find_stable_pairs_trading_candidates(self, threshold=0.85, n_blocks=4, significance=0.05):
+        """
+        Pairs trading candidates whose correlation holds in every time block
+        
+        Args:
+            threshold: Minimum correlation for pairs trading (default 0.85)
+            n_blocks: Number of consecutive blocks to compare
+            significance: Test level of the stability / break tests
+        
+        Returns:
+            List of (asset1, asset2, correlation) tuples
+        """
+        pairs = self.find_pairs_trading_candidates(threshold=threshold)
+        if not pairs:
+            return pairs
+        return self.correlation_stability(n_blocks, significance).filter_pairs(pairs)
+    
+    def find_cointegrated_pairs(self, threshold=0.85, significance='5%', workers=None):
+        """
+        Screen pairs trading candidates for a mean-reverting spread
+        
+        Args:
+            threshold: Minimum correlation for pairs trading (default 0.85)
+            significance: ADF critical value to use ('1%', '5%', '10%')
+            workers: Number of worker processes (None = single process)
+        
+        Returns:
+            List of result dictionaries (hedge_ratio, adf_stat, half_life,
+            is_cointegrated, ...), most stationary spread first
+        """
+        from pairs_screening import screen_pairs
+        
+        candidates = self.find_pairs_trading_candidates(threshold=threshold)
+        screened = screen_pairs(self.returns, candidates,
+                                significance=significance, workers=workers)
+        return screened['pairs']
+    
+    def backtest_pairs_trading(self, train_size=60, test_size=20, threshold=0.85,
+                               entry_z=2.0, exit_z=0.5, significance=None, workers=None):
+        """
+        Walk-forward backtest of the pairs trading candidates
+        
+        Pairs are re-formed on every training window and their spread is
+        traded on the next window with a z-score entry/exit rule.
+        
+        Args:
+            train_size: Periods used to form pairs and hedge ratios
+            test_size: Out-of-sample periods traded after each training window
+            threshold: Minimum correlation for pairs trading (default 0.85)
+            entry_z, exit_z: Spread z-scores to open / close a position
+            significance: Only trade cointegrated pairs ('1%', '5%', '10%')
+            workers: Number of worker processes (None = single process)
+        
+        Returns:
+            Dictionary with out-of-sample 'returns', 'total_pnl', 'turnover',
+            'trades', 'sharpe' and per-window details
+        """
+        from pairs_backtest import walk_forward_backtest
+        
+        return walk_forward_backtest(self.returns, train_size=train_size, test_size=test_size,
+                                     threshold=threshold, entry_z=entry_z, exit_z=exit_z,
+                                     significance=significance, workers=workers)
+    
+    def hierarchical_clusters(self, method='single', n_clusters=2):
+        """
+        Cluster assets by correlation distance (hierarchical risk parity tree)
+        
+        Args:
+            method: Linkage method - 'single', 'average' or 'ward'
+            n_clusters: Number of flat clusters to cut the tree into
+        
+        Returns:
+            Dictionary with linkage tree, quasi-diagonal order and clusters
+        """
+        from clustering import correlation_distance, linkage_tree, quasi_diagonal_order, cut_tree
+        
+        corr_data = self.correlation_matrix()
+        assets = corr_data['assets']
+        
+        distances = correlation_distance(corr_data['matrix'])
+        linkage = linkage_tree(distances, method=method)
+        order = quasi_diagonal_order(linkage, len(assets))
+        labels = cut_tree(linkage, len(assets), n_clusters=n_clusters)
+        
+        return {
+            'linkage': linkage,
+            'order': [assets[i] for i in order],
+            'clusters': {assets[i]: labels[i] for i in range(len(assets))},
+            'assets': assets
+        }
+    
+    def factor_decomposition(self, n_factors=1, n_iter=3, seed=0):
+        """
+        Statistical factors (PCA) of the portfolio returns
+        
+        Only the top factors are computed (randomized truncated solver), so
+        this scales to thousands of assets. Run pairs screening on the
+        residuals to trade spreads that are not just market exposure:
+            residual = PortfolioAnalyzer(result['residuals'])
+        
+        Args:
+            n_factors: Number of factors (1 = market factor)
+            n_iter: Power iterations of the solver
+            seed: Random seed of the solver
+        
+        Returns:
+            Dictionary with loadings, factor returns, explained variance
+            and factor-neutral residual returns
+        """
+        from pca import factor_decomposition
+        
+        return factor_decomposition(self.returns, n_factors=n_factors,
+                                    n_iter=n_iter, seed=seed)
+    
+    def portfolio_statistics(self, confidence=0.95):
+        """
+        Calculate statistics for each asset
+        
+        Args:
+            confidence: VaR / CVaR confidence level (default 0.95)
         
-        return stats
+        Returns:
+            Dictionary of {asset: stats} with mean_return, volatility,
+            sharpe_approx, max_return, min_return, max_drawdown,
+            value_at_risk, conditional_var, skewness and excess_kurtosis
+        """
+        from risk_statistics import universe_statistics
+        
+        return universe_statistics(self.returns, confidence)
     
     def print_statistics(self):
         """Pretty print portfolio statistics"""
         stats = self.portfolio_statistics()
         
-        print("\n" + "="*60)
+        print("\n" + "="*78)
         print("PORTFOLIO STATISTICS")
-        print("="*60)
-        print(f"{'Asset':<8} {'Mean':>8} {'Vol':>8} {'Sharpe':>8} {'Max':>8} {'Min':>8}")
-        print("-" * 60)
+        print("="*78)
+        print(f"{'Asset':<8} {'Mean':>8} {'Vol':>8} {'Sharpe':>8} {'Max':>8} {'Min':>8} "
+              f"{'MaxDD':>8} {'VaR95':>8} {'CVaR95':>8}")
+        print("-" * 78)
         
         for asset, stat in stats.items():
             print(f"{asset:<8} "
@@ -172,9 +401,12 @@ class PortfolioAnalyzer:
                   f"{stat['volatility']:>8.4f} "
                   f"{stat['sharpe_approx']:>8.2f} "
                   f"{stat['max_return']:>8.4f} "
-                  f"{stat['min_return']:>8.4f}")
+                  f"{stat['min_return']:>8.4f} "
+                  f"{stat['max_drawdown']:>8.4f} "
+                  f"{stat['value_at_risk']:>8.4f} "
+                  f"{stat['conditional_var']:>8.4f}")
         
-        print("="*60)
+        print("="*78)
     
     def generate_insights(self):
         """Generate trading insights from analysis"""